@@ -0,0 +1,120 @@
+# bench_assistant_stream.py
+"""
+Mede o streaming do assistente contra um servidor local falso, compatível com
+a API da OpenAI (POST /v1/chat/completions com stream=true, em SSE).
+
+O servidor responde com N pedaços espaçados por --delay-ms. O script mostra o
+tempo até o primeiro pedaço e o tempo total, e falha (código 1) se o primeiro
+pedaço passar de --budget-ms.
+
+Uso: python bench_assistant_stream.py [--chunks 40] [--delay-ms 50] [--budget-ms 500]
+Também serve para testar o app: python bench_assistant_stream.py --serve
+e OPENAI_BASE_URL=http://127.0.0.1:<porta>/v1 OPENAI_API_KEY=teste python main.py
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(chunks: int, delay: float):
+    class FakeOpenAIHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _chunk(self, payload):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def do_POST(self):
+            if not self.path.endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk",
+                    "created": int(time.time()), "model": body.get("model", "fake")}
+
+            if not body.get("stream"):
+                text = " ".join(f"palavra{i}" for i in range(chunks))
+                data = json.dumps({**base, "object": "chat.completion", "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}
+                ]}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self._chunk({**base, "choices": [{"index": 0, "delta": {"role": "assistant"}, "finish_reason": None}]})
+            for i in range(chunks):
+                time.sleep(delay)
+                self._chunk({**base, "choices": [
+                    {"index": 0, "delta": {"content": f"palavra{i} "}, "finish_reason": None}
+                ]})
+            self._chunk({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return FakeOpenAIHandler
+
+
+def start_server(chunks: int, delay: float):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(chunks, delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--delay-ms", type=float, default=50.0)
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="tempo máximo até o primeiro pedaço (ms)")
+    parser.add_argument("--serve", action="store_true", help="só sobe o servidor falso e espera")
+    args = parser.parse_args()
+
+    server = start_server(args.chunks, args.delay_ms / 1000)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    if args.serve:
+        print(f"Servidor falso em {base_url} (Ctrl+C para sair)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            return 0
+
+    from openai import OpenAI
+    from logic.ai_assistant import AIAssistant
+
+    assistant = AIAssistant(client=OpenAI(api_key="teste", base_url=base_url), cache_enabled=False)
+    transactions = [{"id": "1", "date": "2024-01-10", "amount": 100.0, "type": "entrada", "category": "Salário"}]
+
+    start = time.perf_counter()
+    first = None
+    parts = []
+    for delta in assistant.ask_stream("Como estão minhas finanças?", user_id="bench", transactions=transactions):
+        if first is None:
+            first = time.perf_counter() - start
+        parts.append(delta)
+    total = time.perf_counter() - start
+    server.shutdown()
+
+    if first is None:
+        print("❌ Nenhum pedaço recebido.")
+        return 1
+    print(f"Primeiro pedaço: {first * 1000:.0f} ms | resposta completa: {total * 1000:.0f} ms "
+          f"({len(parts)} pedaços, {len(''.join(parts))} caracteres)")
+    if first * 1000 > args.budget_ms:
+        print("❌ Primeiro pedaço acima do limite.")
+        return 1
+    print("✅ Streaming dentro do esperado.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# bench_startup.py
+"""
+Mede a inicialização a frio até a tela de login aparecer.
+
+Roda o app em um processo novo com `python -X importtime`, abre a janela de
+login (plataforma Qt "offscreen") e sai. Falha (código 1) se algum módulo
+pesado for importado antes do login ou se o tempo passar do limite.
+
+Uso: python bench_startup.py [--budget-ms 1500] [--top 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Não devem ser carregados antes do login
+HEAVY_MODULES = ("matplotlib", "pandas", "numpy", "openai", "dotenv", "firebase_admin", "google.cloud")
+
+SNIPPET = """
+import sys
+from PyQt6.QtWidgets import QApplication
+import main
+app = QApplication(sys.argv)
+controller = main.AppController(app)
+app.processEvents()
+"""
+
+
+def parse_importtime(stderr: str):
+    """Retorna [(módulo, tempo_cumulativo_us)] a partir da saída de -X importtime."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        try:
+            imports.append((name.strip(), int(cumulative_us)))
+        except ValueError:
+            continue  # cabeçalho
+    return imports
+
+
+def heavy_imports(imports):
+    """Módulos de HEAVY_MODULES (ou submódulos deles) presentes em imports."""
+    return sorted({name for name, _ in imports
+                   if any(name == m or name.startswith(m + ".") for m in HEAVY_MODULES)})
+
+
+def measure_startup():
+    """Abre a tela de login em um processo novo. Retorna (processo concluído, tempo em ms)."""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SNIPPET],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    return proc, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=1500.0,
+                        help="tempo máximo até a tela de login (ms)")
+    parser.add_argument("--top", type=int, default=10, help="quantos imports mais lentos listar")
+    args = parser.parse_args()
+
+    proc, elapsed_ms = measure_startup()
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        print("❌ O app não conseguiu abrir a tela de login.")
+        return 1
+
+    imports = parse_importtime(proc.stderr)
+    heavy = heavy_imports(imports)
+
+    print(f"Tempo até a tela de login: {elapsed_ms:.0f} ms (limite {args.budget_ms:.0f} ms)")
+    print("Imports mais lentos:")
+    top_level = [(n, us) for n, us in imports if "." not in n]
+    for name, us in sorted(top_level, key=lambda x: x[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if heavy:
+        print(f"❌ Módulos pesados importados antes do login: {', '.join(heavy)}")
+        failed = True
+    if elapsed_ms > args.budget_ms:
+        print("❌ Inicialização acima do limite.")
+        failed = True
+    if not failed:
+        print("✅ Inicialização dentro do esperado.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -34,6 +34,17 @@ STYLE_PATH = ASSETS_DIR / "style.qss"
 JSON_DB_PATH = DATABASE_DIR / "data.json"
 APP_ICON = ICONS_DIR / "app_icon.png"
 
+# ==========================
+# Assistente de IA
+# ==========================
+# Orçamento (tokens estimados) do resumo financeiro enviado a cada pergunta
+AI_CONTEXT_TOKEN_BUDGET = 1500
+# Servidor compatível com a API da OpenAI (None = api.openai.com ou OPENAI_BASE_URL)
+AI_BASE_URL = None
+# Cache local de respostas: validade (segundos) e número máximo de respostas guardadas
+AI_CACHE_TTL = 24 * 60 * 60
+AI_CACHE_MAX_ENTRIES = 500
+
 # ==========================
 # Informações do App
 # ==========================
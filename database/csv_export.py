@@ -0,0 +1,95 @@
+# database/csv_export.py
+"""
+Exportação de transações para CSV em streaming.
+
+As linhas chegam de um iterável (ex.: um gerador que pagina o Firestore) e são
+copiadas para um arquivo temporário em JSON Lines enquanto o conjunto de
+colunas é descoberto. Depois o CSV é escrito em blocos com o cabeçalho
+completo (união de todas as colunas, em ordem estável). A memória usada não
+depende do número de transações.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from logic.transaction import as_dict
+
+# Colunas conhecidas, sempre nesta ordem; campos extras vêm depois, na ordem em que aparecem
+BASE_FIELDS = [
+    "id", "date", "date_day", "desc", "amount", "currency", "type",
+    "category", "recurrence", "user_id", "updated_at",
+]
+
+CHUNK_SIZE = 1000
+_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+
+def _open_output(path: str, use_gzip: bool):
+    if use_gzip:
+        return io.TextIOWrapper(gzip.open(path, "wb"), encoding="utf-8", newline="")
+    return open(path, "w", newline="", encoding="utf-8", buffering=_BUFFER_SIZE)
+
+
+def write_csv(rows, path: str, use_gzip: bool = None, progress_callback=None,
+              chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Escreve as linhas (dicts) de `rows` em `path` e retorna quantas foram gravadas.
+    - use_gzip: compacta a saída (padrão: se o caminho termina em ".gz")
+    - progress_callback(linhas, total): chamado a cada bloco; total é None
+      enquanto as linhas ainda estão sendo lidas
+    Nada é criado em `path` se não houver linhas.
+    """
+    if use_gzip is None:
+        use_gzip = path.endswith(".gz")
+
+    fields = {}
+    count = 0
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        # 1ª passada: lê a origem uma única vez, guardando as linhas em disco
+        for row in rows:
+            for key in row:
+                if key not in fields:
+                    fields[key] = None
+            spool.write(json.dumps(as_dict(row), default=str, ensure_ascii=False))
+            spool.write("\n")
+            count += 1
+            if progress_callback and count % chunk_size == 0:
+                progress_callback(count, None)
+        if not count:
+            return 0
+
+        fieldnames = [f for f in BASE_FIELDS if f in fields]
+        fieldnames += [f for f in fields if f not in BASE_FIELDS]
+
+        # 2ª passada: CSV em blocos, com o cabeçalho completo
+        spool.seek(0)
+        tmp_path = f"{path}.part"
+        written = 0
+        try:
+            with _open_output(tmp_path, use_gzip) as out:
+                writer = csv.DictWriter(out, fieldnames=fieldnames, restval="")
+                writer.writeheader()
+                chunk = []
+                for line in spool:
+                    chunk.append(json.loads(line))
+                    if len(chunk) >= chunk_size:
+                        writer.writerows(chunk)
+                        written += len(chunk)
+                        chunk = []
+                        if progress_callback:
+                            progress_callback(written, count)
+                if chunk:
+                    writer.writerows(chunk)
+                    written += len(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    if progress_callback:
+        progress_callback(written, count)
+    return written
@@ -1,45 +1,45 @@
 # database/data_manager.py
-import os
-import sys
-import uuid
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import firestore
+from google.cloud.firestore_v1.base_query import FieldFilter
 
+from database.firestore_client import get_db
+from logic.dates import DATE_DAY_FIELD, normalize_transaction, parse_epoch_day
+from logic.transaction import Transaction
+from database.sqlite_manager import (
+    cache_upsert_transactions,
+    cache_delete_transaction,
+    cache_delete_transactions,
+    cache_load_transactions,
+    cache_get_transactions,
+    cache_write_with_outbox,
+    get_watermark,
+    set_watermark,
+    outbox_pending_ids,
+)
+from database.transaction_index import (
+    TransactionIndex, get_index, build_index, index_upsert, index_update, index_remove
+)
 
-# ========================
-# Caminho do Firebase Key
-# ========================
-def resource_path(relative_path):
-    if getattr(sys, 'frozen', False):
-        base_path = os.path.dirname(sys.executable)
-    else:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
 
+# Exclusões viram "lápides": o documento fica no Firestore com deleted=True e um
+# updated_at novo, para que a sincronização incremental de outros aparelhos
+# (que só lê updated_at >= marca d'água) também veja a exclusão.
+DELETED_FIELD = "deleted"
 
-# ========================
-# Inicializa Firebase
-# ========================
-cred_path = resource_path("config/firebase_key.json")
-if not firebase_admin._apps:
-    cred = credentials.Certificate(cred_path)
-    firebase_admin.initialize_app(cred)
 
-db = firestore.client()
+def _is_deleted(t) -> bool:
+    return bool(t.get(DELETED_FIELD))
 
 
 # ========================
 # Adicionar transação
 # ========================
-def add_transaction(transaction: dict) -> str:
-    """
-    Adiciona uma transação ao Firebase.
-    Retorna o ID gerado.
-    """
-
-    # Preencher valores padrão
+def _apply_defaults(transaction: dict) -> dict:
+    """Preenche valores padrão e a data canônica (date_day)."""
     transaction.setdefault("desc", "Sem descrição")
     transaction.setdefault("amount", 0.0)
     transaction.setdefault("type", "receita")
@@ -47,74 +47,288 @@ def add_transaction(transaction: dict) -> str:
     transaction.setdefault("recurrence", "Única")
     transaction.setdefault("currency", "BRL")
     transaction.setdefault("category", "Outros")
+    return normalize_transaction(transaction)
+
+
+def add_transaction(transaction: dict) -> str:
+    """
+    Adiciona uma transação: grava no cache local e enfileira uma única escrita
+    para o Firebase (enviada em segundo plano por logic.firebase.flush_outbox).
+    O ID do documento é gerado no cliente (ou reaproveitado, se já vier em "id").
+    Retorna o ID.
+    """
+    if isinstance(transaction, Transaction):  # ex.: restaurar uma linha vinda do índice
+        transaction = transaction.to_dict()
+    _apply_defaults(transaction)
+
+    # Reserva a referência (ID gerado localmente, sem ida ao servidor)
+    doc_ref = get_db().collection("transactions").document(transaction.get("id") or None)
+    transaction["id"] = doc_ref.id
 
-    # Gera ID único
-    temp_id = str(uuid.uuid4())
-    transaction.setdefault("id", temp_id)
+    # Salva localmente e enfileira o envio (documento completo, uma única escrita),
+    # na mesma transação do SQLite
+    transaction["updated_at"] = time.time()
+    cache_write_with_outbox([("set", doc_ref.id, transaction)], upserts=[transaction])
+    index_upsert([transaction])
 
-    # Salva no Firebase
-    doc_ref = db.collection("transactions").add(transaction)
-    firebase_id = doc_ref[1].id
+    return doc_ref.id
 
-    # Atualiza campo id com o ID real do Firebase
-    db.collection("transactions").document(firebase_id).update({"id": firebase_id})
 
-    return firebase_id
+def add_transactions(transactions: list) -> list:
+    """
+    Versão em lote de add_transaction (ex.: importação de extratos): uma única
+    gravação no cache e na fila de saída para todo o lote; o envio ao Firebase
+    sai em commits de até 500 (flush_outbox). Cada transação deve trazer "id".
+    Retorna os IDs.
+    """
+    now = time.time()
+    for t in transactions:
+        _apply_defaults(t)
+        t["updated_at"] = now
+
+    cache_write_with_outbox([("set", t["id"], t) for t in transactions], upserts=transactions)
+    index_upsert(transactions)
+    return [t["id"] for t in transactions]
 
 
 # ========================
 # Editar transação
 # ========================
 def edit_transaction(doc_id: str, new_data: dict):
-    db.collection("transactions").document(doc_id).update(new_data)
+    if "date" in new_data:
+        new_data = {**new_data, DATE_DAY_FIELD: parse_epoch_day(new_data["date"])}
+    cache_write_with_outbox(
+        [("merge", doc_id, new_data)], updates=[(doc_id, {**new_data, "updated_at": time.time()})]
+    )
+    index_update(doc_id, new_data)
 
 
 # ========================
 # Deletar transação
 # ========================
 def delete_transaction(doc_id: str):
-    db.collection("transactions").document(doc_id).delete()
+    # lápide (updated_at vem do servidor)
+    cache_write_with_outbox([("merge", doc_id, {DELETED_FIELD: True})], deletes=[doc_id])
+    index_remove(doc_id)
 
 
 # ========================
 # Carregar transações
 # ========================
-def load_transactions(user_id: str = None):
-    docs = list(db.collection("transactions").stream())
-    transactions = [doc.to_dict() for doc in docs]
+def query_transactions(user_id: str, start_date=None, end_date=None,
+                       tx_type: str = None, category: str = None):
+    """
+    Monta a consulta de transações de um usuário com os filtros aplicados
+    no próprio Firestore (só os documentos do usuário são lidos).
+    Datas (date, "aaaa-mm-dd" ou "dd/mm/aaaa") são comparadas pelo campo inteiro date_day.
+    Os índices compostos necessários estão em firestore.indexes.json.
+    """
+    query = get_db().collection("transactions").where(filter=FieldFilter("user_id", "==", user_id))
+    if tx_type:
+        query = query.where(filter=FieldFilter("type", "==", tx_type))
+    if category:
+        query = query.where(filter=FieldFilter("category", "==", category))
+    if start_date:
+        query = query.where(filter=FieldFilter(DATE_DAY_FIELD, ">=", parse_epoch_day(start_date)))
+    if end_date:
+        query = query.where(filter=FieldFilter(DATE_DAY_FIELD, "<=", parse_epoch_day(end_date)))
+    return query
 
-    if user_id:
-        transactions = [t for t in transactions if t.get("user_id") == user_id]
 
-    return transactions
+def load_transactions(user_id: str = None, start_date=None, end_date=None,
+                      tx_type: str = None, category: str = None):
+    if not user_id:
+        docs = get_db().collection("transactions").stream()
+    else:
+        docs = query_transactions(user_id, start_date, end_date, tx_type, category).stream()
+    return [t for t in (doc.to_dict() for doc in docs) if not _is_deleted(t)]
+
+
+def load_transactions_page(user_id: str, page_size: int = 50, cursor=None,
+                           start_date=None, end_date=None,
+                           tx_type: str = None, category: str = None):
+    """
+    Carrega uma página de transações do usuário do Firestore, da mais recente para a mais antiga.
+    `cursor` é o snapshot do último documento da página anterior (None = primeira página).
+    Escritas locais ainda na fila de saída ficam por cima: os documentos com escrita
+    pendente saem das páginas do servidor e a versão local (se não foi excluída) entra
+    no topo da primeira página.
+    Retorna (transações, próximo_cursor); próximo_cursor é None quando não há mais páginas.
+    """
+    query = query_transactions(user_id, start_date, end_date, tx_type, category)
+    query = query.order_by(DATE_DAY_FIELD, direction=firestore.Query.DESCENDING).limit(page_size)
+    if cursor is not None:
+        query = query.start_after(cursor)
+
+    docs = list(query.stream())
+    next_cursor = docs[-1] if len(docs) == page_size else None
+
+    pending = outbox_pending_ids()
+    page = []
+    for doc in docs:
+        t = doc.to_dict()
+        if _is_deleted(t) or doc.id in pending:
+            continue
+        t.setdefault("id", doc.id)
+        page.append(t)
+    if cursor is None and pending:
+        local = [t for t in cache_get_transactions(pending) if t.get("user_id") == user_id]
+        page = TransactionIndex(local).query(
+            start_date=start_date, end_date=end_date, tx_type=tx_type, category=category
+        ) + page
+    return page, next_cursor
+
+
+def load_local_page(user_id: str, page_size: int = 50, cursor=None,
+                    start_date=None, end_date=None, tx_type: str = None, category: str = None):
+    """
+    Mesma página de load_transactions_page, servida pelo cache local (índice em memória),
+    que já inclui as escritas pendentes e não tem as excluídas.
+    `cursor` é o (dia, id) devolvido pela página anterior.
+    """
+    return transaction_index(user_id).page(
+        page_size, cursor, start_date=start_date, end_date=end_date, tx_type=tx_type, category=category
+    )
 
 
 # ========================
-# Exportar CSV
+# Cache local (SQLite)
 # ========================
-def export_csv(path: str, user_id: str = None):
-    import csv
-    transactions = load_transactions(user_id)
-    if not transactions:
-        print("Nenhuma transação para exportar.")
-        return
-    with open(path, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=transactions[0].keys())
-        writer.writeheader()
-        for t in transactions:
-            writer.writerow(t)
-    print(f"Transações exportadas para {path} com sucesso.")
+def _to_epoch(value) -> float:
+    """Converte o updated_at do Firestore (datetime) para epoch em segundos."""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return float(value or 0)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _from_snapshot(doc) -> dict:
+    """Documento do Firestore -> dict no formato do cache (id, updated_at em epoch, date_day)."""
+    t = doc.to_dict()
+    t["id"] = doc.id
+    t["updated_at"] = _to_epoch(t.get("updated_at"))
+    if t.get(DATE_DAY_FIELD) is None:
+        normalize_transaction(t)
+    return t
+
+
+def sync_transactions_cache(user_id: str) -> int:
+    """
+    Sincroniza o cache local do usuário com o Firestore.
+    Na primeira vez lê todas as transações do usuário; depois, apenas as
+    alteradas desde a última marca d'água (campo updated_at).
+    Retorna quantos documentos foram baixados.
+    """
+    watermark = get_watermark(user_id)
+    query = query_transactions(user_id)
+    if watermark is not None:
+        since = datetime.fromtimestamp(watermark, tz=timezone.utc)
+        query = query.where(filter=FieldFilter("updated_at", ">=", since))
+
+    # Documentos com escritas locais ainda na fila não são sobrescritos
+    pending = outbox_pending_ids()
+
+    changed = [_from_snapshot(doc) for doc in query.stream()]
+
+    fresh = [t for t in changed if t["id"] not in pending]
+    removed = [t["id"] for t in fresh if _is_deleted(t)]
+    fresh = [t for t in fresh if not _is_deleted(t)]
+    cache_delete_transactions(removed)
+    for doc_id in removed:
+        index_remove(doc_id)
+    cache_upsert_transactions(fresh)
+    index_upsert(fresh)
+    newest = max((t["updated_at"] for t in changed), default=0.0)
+    set_watermark(user_id, max(newest, watermark or 0.0))
+    return len(changed)
+
+
+def load_cached_transactions(user_id: str, refresh: bool = True):
+    """
+    Lê as transações do usuário a partir do cache local.
+    Com refresh=True, busca antes só o que mudou no Firestore (inclusive as
+    lápides de exclusões feitas em outro aparelho); se a rede falhar, devolve
+    o que estiver em cache.
+    """
+    if refresh:
+        try:
+            sync_transactions_cache(user_id)
+        except Exception as e:
+            print(f"[Cache] Falha ao sincronizar, usando dados locais: {e}")
+    return transaction_index(user_id).all()
+
+
+def listen_transactions(user_id: str, callback):
+    """
+    Escuta em tempo real as transações do usuário alteradas desde a última sincronização.
+    Cada lote de mudanças é aplicado ao cache local e ao índice em memória e depois
+    repassado a callback([(tipo, transação)]), com tipo "added", "modified" ou "removed".
+    Documentos com escritas locais ainda na fila não são sobrescritos.
+    A callback roda numa thread do Firestore. Retorna o watch (use .unsubscribe()).
+    """
+    watermark = get_watermark(user_id)
+    query = query_transactions(user_id)
+    if watermark is not None:
+        since = datetime.fromtimestamp(watermark, tz=timezone.utc)
+        query = query.where(filter=FieldFilter("updated_at", ">=", since))
+
+    def _on_snapshot(_docs, changes, _read_time):
+        try:
+            pending = outbox_pending_ids()
+            upserts, removed, deltas = [], [], []
+            newest = 0.0
+            for change in changes:
+                kind = change.type.name.lower()
+                if kind == "removed":
+                    cache_delete_transaction(change.document.id)
+                    index_remove(change.document.id)
+                    deltas.append(("removed", {"id": change.document.id}))
+                    continue
+                t = _from_snapshot(change.document)
+                newest = max(newest, t["updated_at"])
+                if t["id"] in pending:
+                    continue
+                if _is_deleted(t):
+                    removed.append(t["id"])
+                    index_remove(t["id"])
+                    deltas.append(("removed", {"id": t["id"]}))
+                    continue
+                upserts.append(t)
+                deltas.append((kind, t))
+
+            cache_delete_transactions(removed)
+            cache_upsert_transactions(upserts)
+            index_upsert(upserts)
+            if newest:
+                set_watermark(user_id, max(newest, get_watermark(user_id) or 0.0))
+            if deltas:
+                callback(deltas)
+        except Exception as e:
+            print(f"[Tempo real] Falha ao aplicar mudanças: {e}")
+
+    return query.on_snapshot(_on_snapshot)
+
+
+_index_build_lock = threading.Lock()
+
+
+def transaction_index(user_id: str) -> TransactionIndex:
+    """Índice em memória do usuário, montado a partir do cache local no primeiro uso."""
+    index = get_index(user_id)
+    if index is None:
+        # GUI e threads de fundo podem chegar juntas: só uma monta o índice
+        with _index_build_lock:
+            index = get_index(user_id)
+            if index is None:
+                index = build_index(user_id, cache_load_transactions(user_id))
+    return index
 
 
 # ========================
 # Filtro
 # ========================
 def filter_transactions(transactions, start_date=None, end_date=None, tipo=None):
-    filtered = transactions
-    if start_date:
-        filtered = [t for t in filtered if t.get("date") >= start_date]
-    if end_date:
-        filtered = [t for t in filtered if t.get("date") <= end_date]
-    if tipo:
-        filtered = [t for t in filtered if t.get("type") == tipo]
-    return filtered
+    """Filtra uma lista avulsa (para as do usuário, prefira transaction_index(user_id).query)."""
+    return TransactionIndex(transactions).query(start_date=start_date, end_date=end_date, tx_type=tipo)
@@ -0,0 +1,77 @@
+# database/firestore_client.py
+import os
+import sys
+import threading
+import logging
+
+import config
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+# ========================
+# Cliente Firestore compartilhado
+# ========================
+# Um único cliente (e um único canal gRPC) por processo, criado no primeiro uso.
+_lock = threading.Lock()
+_client = None
+_backend = None
+
+
+def credentials_path():
+    """
+    Resolve o arquivo de credenciais do Firebase, nesta ordem:
+    GOOGLE_APPLICATION_CREDENTIALS, config/ ao lado do exe/script, config/ dentro do bundle (PyInstaller).
+    Retorna None se nenhum existir (usa Application Default Credentials).
+    """
+    candidates = [
+        os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"),
+        str(config.FIREBASE_KEY_PATH),
+    ]
+    if hasattr(sys, "_MEIPASS"):
+        candidates.append(os.path.join(sys._MEIPASS, "config", "firebase_key.json"))
+
+    for path in candidates:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+def _create_client():
+    try:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+    except Exception as e:
+        raise RuntimeError("Instale firebase-admin (pip install firebase-admin) e configure as credenciais.") from e
+
+    if not firebase_admin._apps:
+        cred_path = credentials_path()
+        if cred_path:
+            firebase_admin.initialize_app(credentials.Certificate(cred_path))
+            _log.debug("Firebase inicializado com credenciais em %s", cred_path)
+        else:
+            firebase_admin.initialize_app()
+            _log.debug("Firebase inicializado com Application Default Credentials")
+
+    return firestore.client()
+
+
+def get_db():
+    """Retorna o cliente Firestore do processo (criado no primeiro uso, de forma thread-safe)."""
+    global _client
+    if _backend is not None:
+        return _backend
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = _create_client()
+    return _client
+
+
+def set_backend(backend):
+    """
+    Substitui o Firestore por outro objeto com a mesma interface
+    (ex.: um cliente em memória nos testes). None volta ao Firestore real.
+    """
+    global _backend
+    _backend = backend
@@ -0,0 +1,67 @@
+# database/migrate_dates.py
+"""
+Migração: grava o campo "date_day" (epoch-day) em todas as transações.
+
+- Firestore: documentos sem date_day (ou com valor desatualizado) recebem um
+  merge só com esse campo, em lotes via bulk_write.
+- Cache SQLite: a coluna date_day é preenchida a partir do JSON de cada linha.
+
+Uso: python -m database.migrate_dates [--dry-run]
+"""
+import argparse
+import json
+
+from database.firestore_client import get_db
+from database.sqlite_manager import connect, init_db
+from logic.dates import DATE_DAY_FIELD, parse_epoch_day
+
+
+def migrate_firestore(dry_run: bool = False) -> dict:
+    operations = []
+    unparsed = []
+    for doc in get_db().collection("transactions").stream():
+        data = doc.to_dict()
+        day = parse_epoch_day(data.get("date"))
+        if day is None:
+            unparsed.append(doc.id)
+            continue
+        if data.get(DATE_DAY_FIELD) != day:
+            operations.append(("merge", doc.id, {DATE_DAY_FIELD: day}))
+
+    result = {"pending": len(operations), "written": 0, "failed": 0, "unparsed": unparsed}
+    if operations and not dry_run:
+        from logic.firebase import bulk_write
+        written = bulk_write(operations)
+        result["written"] = written["written"]
+        result["failed"] = written["failed"]
+    return result
+
+
+def migrate_cache() -> int:
+    init_db()  # cria a coluna date_day em caches antigos
+    conn = connect()
+    rows = conn.execute("SELECT id, data FROM transactions_cache").fetchall()
+    updates = []
+    for doc_id, raw in rows:
+        data = json.loads(raw)
+        day = parse_epoch_day(data.get("date"))
+        data[DATE_DAY_FIELD] = day
+        updates.append((day, json.dumps(data, default=str), doc_id))
+    conn.executemany("UPDATE transactions_cache SET date_day = ?, data = ? WHERE id = ?", updates)
+    conn.commit()
+    conn.close()
+    return len(updates)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dry-run", action="store_true", help="só conta o que seria alterado")
+    args = parser.parse_args()
+
+    if not args.dry_run:
+        print(f"✅ Cache local: {migrate_cache()} transações atualizadas.")
+    result = migrate_firestore(dry_run=args.dry_run)
+    print(f"Firestore: {result['pending']} documentos a atualizar, "
+          f"{result['written']} gravados, {result['failed']} com falha.")
+    if result["unparsed"]:
+        print(f"⚠️ {len(result['unparsed'])} documentos com data não reconhecida: {', '.join(result['unparsed'][:10])}")
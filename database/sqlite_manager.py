@@ -1,8 +1,18 @@
 from pathlib import Path
+import json
 import sqlite3
+import threading
+import time
+
+from logic.transaction import as_dict
 
 DB_PATH = Path(__file__).parent / "db.sqlite"
 
+_initialized = False
+
+# Sinalizado a cada escrita na fila de saída (acorda o sincronizador)
+outbox_wakeup = threading.Event()
+
 def connect():
     return sqlite3.connect(DB_PATH)
 
@@ -30,6 +40,311 @@ def init_db():
     );
     """)
 
+    # Cache local das transações do Firestore (chave = ID do documento)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS transactions_cache (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        date TEXT,
+        date_day INTEGER,
+        updated_at REAL NOT NULL DEFAULT 0,
+        data TEXT NOT NULL
+    );
+    """)
+    # Caches criados antes da coluna date_day (epoch-day)
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(transactions_cache)")}
+    if "date_day" not in columns:
+        cursor.execute("ALTER TABLE transactions_cache ADD COLUMN date_day INTEGER;")
+    cursor.execute("DROP INDEX IF EXISTS idx_transactions_cache_user;")
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_transactions_cache_user_day
+    ON transactions_cache (user_id, date_day);
+    """)
+
+    # Marca d'água da última sincronização por usuário
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sync_state (
+        user_id TEXT PRIMARY KEY,
+        watermark REAL NOT NULL
+    );
+    """)
+
+    # Fila de saída: escritas pendentes de envio ao Firestore, em ordem
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS outbox (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        op TEXT NOT NULL,
+        doc_id TEXT NOT NULL,
+        data TEXT,
+        created_at REAL NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0
+    );
+    """)
+
+    # Escritas recusadas de vez pelo Firestore (tiradas da fila para não travá-la)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS outbox_dead (
+        seq INTEGER PRIMARY KEY,
+        op TEXT NOT NULL,
+        doc_id TEXT NOT NULL,
+        data TEXT,
+        created_at REAL NOT NULL,
+        attempts INTEGER NOT NULL,
+        error TEXT,
+        failed_at REAL NOT NULL
+    );
+    """)
+
+    # Respostas do assistente de IA (chave = hash da pergunta + dados + modelo)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS ai_cache (
+        key TEXT PRIMARY KEY,
+        response TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL
+    );
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_ai_cache_last_used ON ai_cache (last_used);
+    """)
+
+    conn.commit()
+    conn.close()
+
+def _ensure_db():
+    global _initialized
+    if not _initialized:
+        init_db()
+        _initialized = True
+
+# ========================
+# Cache de transações
+# ========================
+def _cache_upsert(conn, transactions):
+    rows = [
+        (
+            str(t["id"]),
+            str(t.get("user_id", "")),
+            t.get("date"),
+            t.get("date_day"),
+            float(t.get("updated_at") or 0),
+            json.dumps(as_dict(t), default=str),
+        )
+        for t in transactions
+        if t.get("id")
+    ]
+    conn.executemany("""
+        INSERT OR REPLACE INTO transactions_cache (id, user_id, date, date_day, updated_at, data)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+
+def _cache_update(conn, doc_id, new_data: dict):
+    row = conn.execute("SELECT data FROM transactions_cache WHERE id = ?", (str(doc_id),)).fetchone()
+    if row is None:
+        return
+    data = json.loads(row[0])
+    data.update(new_data)
+    _cache_upsert(conn, [data])
+
+def _cache_delete(conn, doc_ids):
+    conn.executemany("DELETE FROM transactions_cache WHERE id = ?", [(str(i),) for i in doc_ids])
+
+def _outbox_insert(conn, operations):
+    now = time.time()
+    conn.executemany(
+        "INSERT INTO outbox (op, doc_id, data, created_at) VALUES (?, ?, ?, ?)",
+        [
+            (op, str(doc_id), json.dumps(data, default=str) if data is not None else None, now)
+            for op, doc_id, data in operations
+        ],
+    )
+
+def cache_upsert_transactions(transactions):
+    """Insere ou substitui transações no cache local (cada uma precisa de 'id')."""
+    _ensure_db()
+    conn = connect()
+    with conn:
+        _cache_upsert(conn, transactions)
+    conn.close()
+
+def cache_delete_transaction(doc_id: str):
+    cache_delete_transactions([doc_id])
+
+def cache_delete_transactions(doc_ids):
+    """Remove várias transações do cache numa única transação do SQLite."""
+    _ensure_db()
+    conn = connect()
+    with conn:
+        _cache_delete(conn, doc_ids)
+    conn.close()
+
+def cache_write_with_outbox(operations, upserts=(), updates=(), deletes=()):
+    """
+    Grava a mudança local e enfileira o envio numa única transação do SQLite:
+    ou as duas coisas ficam registradas, ou nenhuma (ex.: queda no meio).
+    - operations: [(op, doc_id, dados)] para a fila de saída ("set", "merge" ou "delete")
+    - upserts: transações completas; updates: [(doc_id, campos)]; deletes: ids
+    """
+    _ensure_db()
+    conn = connect()
+    with conn:
+        _cache_upsert(conn, upserts)
+        for doc_id, new_data in updates:
+            _cache_update(conn, doc_id, new_data)
+        _cache_delete(conn, deletes)
+        _outbox_insert(conn, operations)
+    conn.close()
+    outbox_wakeup.set()
+
+def cache_load_transactions(user_id: str):
+    """Retorna todas as transações em cache do usuário."""
+    _ensure_db()
+    conn = connect()
+    rows = conn.execute(
+        "SELECT data FROM transactions_cache WHERE user_id = ? ORDER BY date_day DESC",
+        (str(user_id),)
+    ).fetchall()
+    conn.close()
+    return [json.loads(r[0]) for r in rows]
+
+def cache_get_transactions(doc_ids):
+    """Transações em cache com esses IDs (as ausentes ficam de fora)."""
+    doc_ids = [str(i) for i in doc_ids]
+    if not doc_ids:
+        return []
+    _ensure_db()
+    conn = connect()
+    rows = conn.execute(
+        f"SELECT data FROM transactions_cache WHERE id IN ({','.join('?' * len(doc_ids))})", doc_ids
+    ).fetchall()
+    conn.close()
+    return [json.loads(r[0]) for r in rows]
+
+def cache_clear_user(user_id: str):
+    """Remove o cache e a marca d'água do usuário (força sincronização completa)."""
+    _ensure_db()
+    conn = connect()
+    conn.execute("DELETE FROM transactions_cache WHERE user_id = ?", (str(user_id),))
+    conn.execute("DELETE FROM sync_state WHERE user_id = ?", (str(user_id),))
+    conn.commit()
+    conn.close()
+
+def get_watermark(user_id: str):
+    """Retorna o updated_at (epoch) da última sincronização, ou None se nunca sincronizou."""
+    _ensure_db()
+    conn = connect()
+    row = conn.execute("SELECT watermark FROM sync_state WHERE user_id = ?", (str(user_id),)).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+def set_watermark(user_id: str, watermark: float):
+    _ensure_db()
+    conn = connect()
+    conn.execute(
+        "INSERT OR REPLACE INTO sync_state (user_id, watermark) VALUES (?, ?)",
+        (str(user_id), float(watermark))
+    )
+    conn.commit()
+    conn.close()
+
+# ========================
+# Fila de saída (outbox)
+# ========================
+def outbox_peek(limit: int = 500):
+    """Retorna as próximas escritas pendentes, na ordem em que foram feitas: [(seq, op, doc_id, data)]."""
+    _ensure_db()
+    conn = connect()
+    rows = conn.execute(
+        "SELECT seq, op, doc_id, data FROM outbox ORDER BY seq LIMIT ?", (limit,)
+    ).fetchall()
+    conn.close()
+    return [(seq, op, doc_id, json.loads(data) if data else None) for seq, op, doc_id, data in rows]
+
+def outbox_ack(seqs):
+    """Remove da fila as escritas já confirmadas pelo Firestore."""
+    _ensure_db()
+    conn = connect()
+    conn.executemany("DELETE FROM outbox WHERE seq = ?", [(s,) for s in seqs])
+    conn.commit()
+    conn.close()
+
+def outbox_mark_failed(seqs) -> int:
+    """Conta mais uma tentativa para as escritas; retorna o maior número de tentativas entre elas."""
+    _ensure_db()
+    conn = connect()
+    with conn:
+        conn.executemany("UPDATE outbox SET attempts = attempts + 1 WHERE seq = ?", [(s,) for s in seqs])
+        placeholders = ",".join("?" * len(seqs))
+        attempts = conn.execute(
+            f"SELECT MAX(attempts) FROM outbox WHERE seq IN ({placeholders})", list(seqs)
+        ).fetchone()[0]
+    conn.close()
+    return attempts or 0
+
+def outbox_dead_letter(seqs, error: str):
+    """Tira da fila escritas que o Firestore recusou de vez (ficam em outbox_dead para análise)."""
+    _ensure_db()
+    conn = connect()
+    with conn:
+        for seq in seqs:
+            conn.execute("""
+                INSERT OR REPLACE INTO outbox_dead (seq, op, doc_id, data, created_at, attempts, error, failed_at)
+                SELECT seq, op, doc_id, data, created_at, attempts, ?, ? FROM outbox WHERE seq = ?
+            """, (error, time.time(), seq))
+            conn.execute("DELETE FROM outbox WHERE seq = ?", (seq,))
+    conn.close()
+
+def outbox_pending_ids():
+    """IDs de documentos com escritas ainda não enviadas."""
+    _ensure_db()
+    conn = connect()
+    rows = conn.execute("SELECT DISTINCT doc_id FROM outbox").fetchall()
+    conn.close()
+    return {r[0] for r in rows}
+
+def outbox_count() -> int:
+    _ensure_db()
+    conn = connect()
+    count = conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+    conn.close()
+    return count
+
+# ========================
+# Cache de respostas da IA
+# ========================
+def ai_cache_get(key: str, ttl: float):
+    """Resposta guardada para a chave, ou None (ausente ou com mais de `ttl` segundos)."""
+    _ensure_db()
+    now = time.time()
+    conn = connect()
+    row = conn.execute("SELECT response, created_at FROM ai_cache WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        conn.close()
+        return None
+    response, created_at = row
+    if now - created_at > ttl:
+        conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+        response = None
+    else:
+        conn.execute("UPDATE ai_cache SET last_used = ? WHERE key = ?", (now, key))
+    conn.commit()
+    conn.close()
+    return response
+
+def ai_cache_put(key: str, response: str, max_entries: int):
+    """Guarda a resposta; acima de `max_entries`, remove as usadas há mais tempo."""
+    _ensure_db()
+    now = time.time()
+    conn = connect()
+    conn.execute(
+        "INSERT OR REPLACE INTO ai_cache (key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+        (key, response, now, now)
+    )
+    conn.execute("""
+        DELETE FROM ai_cache WHERE key IN (
+            SELECT key FROM ai_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+        )
+    """, (max_entries,))
     conn.commit()
     conn.close()
 
@@ -0,0 +1,324 @@
+# database/transaction_index.py
+"""
+Índice em memória das transações de um usuário.
+
+- datas: lista ordenada de epoch-days, desempatada pelo id (faixas e cursores com bisect)
+- tipo e categoria: buckets {valor: conjunto de ids}
+- valores: lista ordenada de amounts (faixas com bisect)
+
+Uma consulta parte do critério mais seletivo (a menor faixa/bucket) e confere
+os demais direto na linha já normalizada: O(log n + k).
+Adições, edições e exclusões atualizam o índice sem reconstruí-lo.
+As transações ficam guardadas como logic.transaction.Transaction (compactas).
+"""
+import heapq
+import threading
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+from logic.dates import DATE_DAY_FIELD, parse_epoch_day
+from logic.transaction import Transaction
+
+# Transações sem data válida ficam antes de qualquer data real
+_MISSING_DAY = -10 ** 9
+
+
+def _key(value) -> str:
+    return str(value or "").lower()
+
+
+def _sorted_remove(keys: list, ids: list, key, doc_id):
+    """Remove doc_id das listas paralelas ordenadas por key."""
+    i = bisect_left(keys, key)
+    while i < len(keys) and keys[i] == key:
+        if ids[i] == doc_id:
+            del keys[i]
+            del ids[i]
+            return
+        i += 1
+
+
+def _day_order(pair):
+    # (dia, id) com id em texto: listas avulsas podem misturar ids str e int
+    return pair[0], str(pair[1])
+
+
+def _merge_sorted(keys: list, ids: list, new_pairs: list, order=itemgetter(0)):
+    """Intercala pares (chave, id) nas listas paralelas ordenadas, em O(n + m)."""
+    new_pairs.sort(key=order)
+    merged = list(heapq.merge(zip(keys, ids), new_pairs, key=order))
+    return [k for k, _ in merged], [i for _, i in merged]
+
+
+class TransactionIndex:
+    # A partir deste tamanho de lote, intercalar sai mais barato que inserir um a um
+    MERGE_THRESHOLD = 64
+
+    def __init__(self, transactions=()):
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._rows = {}  # id -> (dia, tipo, categoria, valor)
+        self._days, self._day_ids = [], []
+        self._amounts, self._amount_ids = [], []
+        self._types = {}
+        self._categories = {}
+        self.rebuild(transactions)
+
+    # ---------- Manutenção ----------
+    def rebuild(self, transactions):
+        with self._lock:
+            self._by_id = {}
+            self._rows = {}
+            self._types = {}
+            self._categories = {}
+            day_pairs, amount_pairs = [], []
+            for tx in transactions:
+                tx = Transaction.from_dict(tx)
+                doc_id = tx.id or id(tx)  # listas avulsas podem não ter id
+                if doc_id in self._rows:
+                    continue
+                row = self._index_row(doc_id, tx)
+                day_pairs.append((row[0], doc_id))
+                amount_pairs.append((row[3], doc_id))
+            day_pairs.sort(key=_day_order)
+            amount_pairs.sort(key=itemgetter(0))
+            self._days = [d for d, _ in day_pairs]
+            self._day_ids = [i for _, i in day_pairs]
+            self._amounts = [a for a, _ in amount_pairs]
+            self._amount_ids = [i for _, i in amount_pairs]
+
+    def _index_row(self, doc_id, tx):
+        """Registra a transação nos dicionários e buckets; as listas ordenadas ficam com quem chama."""
+        day = tx.date_day
+        row = (_MISSING_DAY if day is None else day, _key(tx.type), _key(tx.category), tx.amount_cents / 100)
+        self._by_id[doc_id] = tx
+        self._rows[doc_id] = row
+        self._types.setdefault(row[1], set()).add(doc_id)
+        self._categories.setdefault(row[2], set()).add(doc_id)
+        return row
+
+    def upsert(self, tx):
+        tx = Transaction.from_dict(tx)
+        doc_id = tx.id
+        if doc_id is None:
+            return
+        with self._lock:
+            self.remove(doc_id)
+            day, _type, _category, amount = self._index_row(doc_id, tx)
+            i = self._day_position(day, doc_id)
+            self._days.insert(i, day)
+            self._day_ids.insert(i, doc_id)
+            i = bisect_right(self._amounts, amount)
+            self._amounts.insert(i, amount)
+            self._amount_ids.insert(i, doc_id)
+
+    def upsert_many(self, transactions):
+        # Um id repetido no lote fica só com a última versão (remove() não enxerga o lote ainda não intercalado)
+        transactions = list({
+            tx.id: tx for tx in (Transaction.from_dict(t) for t in transactions if t.get("id") is not None)
+        }.values())
+        if len(transactions) < self.MERGE_THRESHOLD:
+            for tx in transactions:
+                self.upsert(tx)
+            return
+        with self._lock:
+            day_pairs, amount_pairs = [], []
+            for tx in transactions:
+                doc_id = tx.id
+                self.remove(doc_id)
+                day, _type, _category, amount = self._index_row(doc_id, tx)
+                day_pairs.append((day, doc_id))
+                amount_pairs.append((amount, doc_id))
+            self._days, self._day_ids = _merge_sorted(self._days, self._day_ids, day_pairs, _day_order)
+            self._amounts, self._amount_ids = _merge_sorted(self._amounts, self._amount_ids, amount_pairs)
+
+    def update(self, doc_id, changes: dict):
+        with self._lock:
+            tx = self._by_id.get(doc_id)
+            if tx is None:
+                return
+            merged = {**tx, **changes}
+            if "date" in changes and DATE_DAY_FIELD not in changes:
+                merged[DATE_DAY_FIELD] = parse_epoch_day(changes["date"])
+            self.upsert(merged)
+
+    def _day_position(self, day, doc_id) -> int:
+        """Posição de (dia, id) na ordem das datas (onde está ou onde entraria)."""
+        lo = bisect_left(self._days, day)
+        hi = bisect_right(self._days, day, lo)
+        return bisect_left(self._day_ids, str(doc_id), lo, hi, key=str)
+
+    def remove(self, doc_id):
+        with self._lock:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                return
+            del self._by_id[doc_id]
+            day, tx_type, category, amount = row
+            self._types[tx_type].discard(doc_id)
+            self._categories[category].discard(doc_id)
+            _sorted_remove(self._days, self._day_ids, day, doc_id)
+            _sorted_remove(self._amounts, self._amount_ids, amount, doc_id)
+
+    # ---------- Consulta ----------
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._rows
+
+    def all(self):
+        """Todas as transações, da mais recente para a mais antiga."""
+        with self._lock:
+            return [self._by_id[i] for i in reversed(self._day_ids)]
+
+    def page(self, limit: int, cursor=None, start_date=None, end_date=None, tx_type=None, category=None):
+        """
+        Uma página da mais recente para a mais antiga, sem montar o resultado inteiro.
+        cursor: (dia, id) da última linha da página anterior (None = primeira página);
+        é uma chave, não uma posição, então inserções e exclusões entre as páginas
+        não repetem nem pulam linhas.
+        Retorna (transações, próximo_cursor); próximo_cursor é None no fim.
+        """
+        start_day = parse_epoch_day(start_date)
+        end_day = parse_epoch_day(end_date)
+        type_key = _key(tx_type) if tx_type else None
+        category_key = _key(category) if category else None
+
+        with self._lock:
+            if start_day is not None:
+                lo = bisect_left(self._days, start_day)
+            elif end_day is not None:
+                lo = bisect_right(self._days, _MISSING_DAY)  # sem data não entra num filtro por data
+            else:
+                lo = 0
+            hi = bisect_right(self._days, end_day) if end_day is not None else len(self._days)
+            if cursor is not None:
+                hi = min(hi, self._day_position(*cursor))
+
+            rows = []
+            i = hi - 1
+            while i >= lo and len(rows) < limit:
+                doc_id = self._day_ids[i]
+                _day, row_type, row_category, _amount = self._rows[doc_id]
+                i -= 1
+                if type_key is not None and row_type != type_key:
+                    continue
+                if category_key is not None and row_category != category_key:
+                    continue
+                rows.append(doc_id)
+
+            next_cursor = None
+            if rows and len(rows) == limit and i >= lo:
+                next_cursor = (self._rows[rows[-1]][0], rows[-1])
+            return [self._by_id[doc_id] for doc_id in rows], next_cursor
+
+    def query(self, start_date=None, end_date=None, tx_type=None, category=None,
+              min_amount=None, max_amount=None):
+        """
+        Transações que atendem a todos os critérios informados, da mais recente
+        para a mais antiga. Datas: date, "aaaa-mm-dd", "dd/mm/aaaa" ou epoch-day.
+        Tipo e categoria não diferenciam maiúsculas.
+        """
+        start_day = parse_epoch_day(start_date)
+        end_day = parse_epoch_day(end_date)
+        type_key = _key(tx_type) if tx_type else None
+        category_key = _key(category) if category else None
+
+        with self._lock:
+            # Fontes candidatas: (tamanho, ids, já em ordem de data?)
+            sources = []
+            if start_day is not None or end_day is not None:
+                lo = bisect_left(self._days, start_day) if start_day is not None else bisect_right(self._days, _MISSING_DAY)
+                hi = bisect_right(self._days, end_day) if end_day is not None else len(self._days)
+                sources.append((max(hi - lo, 0), lambda lo=lo, hi=hi: reversed(self._day_ids[lo:hi]), True))
+            if type_key is not None:
+                bucket = self._types.get(type_key, ())
+                sources.append((len(bucket), lambda b=bucket: b, False))
+            if category_key is not None:
+                bucket = self._categories.get(category_key, ())
+                sources.append((len(bucket), lambda b=bucket: b, False))
+            if min_amount is not None or max_amount is not None:
+                lo = bisect_left(self._amounts, min_amount) if min_amount is not None else 0
+                hi = bisect_right(self._amounts, max_amount) if max_amount is not None else len(self._amounts)
+                sources.append((max(hi - lo, 0), lambda lo=lo, hi=hi: self._amount_ids[lo:hi], False))
+            if not sources:
+                return self.all()
+
+            _size, ids, ordered = min(sources, key=lambda s: s[0])
+            by_date = start_day is not None or end_day is not None
+            matches = []
+            for doc_id in ids():
+                day, row_type, row_category, amount = self._rows[doc_id]
+                if by_date and day == _MISSING_DAY:
+                    continue  # sem data nunca entra num filtro por data, qualquer que seja a fonte
+                if start_day is not None and day < start_day:
+                    continue
+                if end_day is not None and day > end_day:
+                    continue
+                if type_key is not None and row_type != type_key:
+                    continue
+                if category_key is not None and row_category != category_key:
+                    continue
+                if min_amount is not None and amount < min_amount:
+                    continue
+                if max_amount is not None and amount > max_amount:
+                    continue
+                matches.append(doc_id)
+
+            if not ordered:
+                matches.sort(key=lambda i: self._rows[i][0], reverse=True)
+            return [self._by_id[i] for i in matches]
+
+
+# ========================
+# Índices por usuário
+# ========================
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(user_id):
+    """Índice do usuário, ou None se ainda não foi montado."""
+    return _indexes.get(user_id)
+
+
+def build_index(user_id, transactions) -> TransactionIndex:
+    index = TransactionIndex(transactions)
+    with _indexes_lock:
+        _indexes[user_id] = index
+    return index
+
+
+def drop_index(user_id):
+    with _indexes_lock:
+        _indexes.pop(user_id, None)
+
+
+def index_upsert(transactions):
+    """Atualiza os índices já montados com transações novas/alteradas."""
+    by_user = {}
+    for tx in transactions:
+        by_user.setdefault(tx.get("user_id"), []).append(tx)
+    for user_id, txs in by_user.items():
+        with _indexes_lock:
+            index = _indexes.get(user_id)
+        if index is not None:
+            index.upsert_many(txs)
+
+
+def _all_indexes():
+    # cópia feita com o lock: build_index/drop_index podem alterar _indexes em outra thread
+    with _indexes_lock:
+        return list(_indexes.values())
+
+
+def index_update(doc_id, changes: dict):
+    for index in _all_indexes():
+        if doc_id in index:
+            index.update(doc_id, changes)
+
+
+def index_remove(doc_id):
+    for index in _all_indexes():
+        index.remove(doc_id)
@@ -5,14 +5,30 @@ Contém a lógica do aplicativo:
 - Autenticação (login)
 - Gerenciamento de transações
 - Geração de relatórios
+
+As funções de .transactions (que carregam Firebase/NumPy) são importadas
+sob demanda, para que importar um submódulo leve (ex.: logic.theme_manager)
+não as carregue.
 """
+from logic.lazy_imports import lazy_attrs
 
 from .auth import validate_login, validate_registration, register_user
-from .transactions import (
-    add_transaction,
-    edit_transaction,
-    delete_transaction,
-    filter_transactions,
-)
+from .transaction import Transaction
+
+__getattr__ = lazy_attrs(__name__, {
+    "add_transaction": ".transactions",
+    "edit_transaction": ".transactions",
+    "delete_transaction": ".transactions",
+    "filter_transactions": ".transactions",
+})
 
-            
\ No newline at end of file
+__all__ = [
+    "validate_login",
+    "validate_registration",
+    "register_user",
+    "add_transaction",
+    "edit_transaction",
+    "delete_transaction",
+    "filter_transactions",
+    "Transaction",
+]
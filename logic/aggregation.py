@@ -0,0 +1,232 @@
+# logic/aggregation.py
+"""
+Agregação vetorizada de transações.
+
+A lista de transações é percorrida uma única vez para montar colunas NumPy
+(valor em centavos, tipo, categoria, moeda, mês); saldo, totais por tipo,
+categoria, mês e moeda saem dessas colunas em operações vetorizadas. A
+conversão de moeda usa a matriz de logic.money e as somas são de centavos
+inteiros; os resultados voltam em unidades (float).
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from logic.dates import DATE_DAY_FIELD, from_epoch_day
+from logic.money import CENTS, from_cents, rate_matrix
+from logic.transaction import Transaction, to_cents
+
+INCOME_TYPES = {"entrada", "receita", "income"}
+EXPENSE_TYPES = {"saída", "saida", "despesa", "expense"}
+
+
+_SIGNS = {}
+
+
+def _type_sign(tx_type) -> int:
+    """+1 para receitas, -1 para despesas, 0 para tipos desconhecidos."""
+    sign = _SIGNS.get(tx_type)
+    if sign is not None:
+        return sign
+    t = str(tx_type or "").lower()
+    sign = 1 if t in INCOME_TYPES else -1 if t in EXPENSE_TYPES else 0
+    if (tx_type is None or type(tx_type) is str) and len(_SIGNS) < 256:
+        _SIGNS[tx_type] = sign  # poucos tipos distintos: memoriza
+    return sign
+
+
+def _month_of(date_str) -> str:
+    """'AAAA-MM' a partir de 'dd/mm/aaaa' ou 'aaaa-mm-dd' ('' se não reconhecer)."""
+    d = str(date_str or "")
+    if len(d) >= 10:
+        if d[4] == "-":
+            return d[:7]
+        if d[2] == "/":
+            return f"{d[6:10]}-{d[3:5]}"
+    return ""
+
+
+@lru_cache(maxsize=4096)
+def _month_of_day(day: int) -> str:
+    """'AAAA-MM' a partir do epoch-day."""
+    return from_epoch_day(day).strftime("%Y-%m")
+
+
+def _tx_month(tx) -> str:
+    if tx.__class__ is Transaction:
+        return _month_of_day(tx.date_day) if tx.date_day is not None else _month_of(tx.date)
+    day = tx.get(DATE_DAY_FIELD)
+    if day is not None:
+        return _month_of_day(day)
+    return _month_of(tx.get("date"))
+
+
+def to_columns(transactions, amount_key: str = "amount", default_category: str = "Outros",
+               unknown_as_expense: bool = False) -> dict:
+    """
+    Converte a lista de transações em colunas (uma única passada em Python).
+    "cents" traz os valores em centavos (int64) e "amount" os mesmos em unidades.
+    Categoria, moeda e mês viram códigos inteiros; os rótulos ficam em "<coluna>_labels".
+    Com unknown_as_expense, tipos desconhecidos contam como despesa (sinal -1).
+    """
+    n = len(transactions)
+    cents = np.empty(n, dtype=np.int64)
+    signs = np.empty(n, dtype=np.int8)
+    codes = {name: np.empty(n, dtype=np.int64) for name in ("category", "currency", "month")}
+    lookup = {name: {} for name in codes}
+
+    cat_codes, cur_codes, month_codes = codes["category"], codes["currency"], codes["month"]
+    cat_lookup, cur_lookup, month_lookup = lookup["category"], lookup["currency"], lookup["month"]
+    for i, tx in enumerate(transactions):
+        if tx.__class__ is Transaction and amount_key == "amount":
+            # Atributos direto (sem hash de chaves); strings internadas, centavos inteiros
+            cents[i] = tx.amount_cents
+            signs[i] = _type_sign(tx.type)
+            category, currency = tx.category, tx.currency
+        else:
+            cents[i] = to_cents(tx.get(amount_key))
+            signs[i] = _type_sign(tx.get("type"))
+            category, currency = tx.get("category"), tx.get("currency")
+        cat_codes[i] = cat_lookup.setdefault(category or default_category, len(cat_lookup))
+        cur_codes[i] = cur_lookup.setdefault(currency or "BRL", len(cur_lookup))
+        month_codes[i] = month_lookup.setdefault(_tx_month(tx), len(month_lookup))
+
+    if unknown_as_expense:
+        signs[signs == 0] = -1
+    columns = {"cents": cents, "amount": cents / CENTS, "sign": signs}
+    for name in codes:
+        columns[name] = codes[name]
+        columns[f"{name}_labels"] = list(lookup[name])
+    return columns
+
+
+def _group_sum(codes: np.ndarray, labels: list, cents: np.ndarray) -> dict:
+    """Soma centavos por grupo (exato até 2**53) e devolve em unidades."""
+    sums = np.bincount(codes, weights=cents, minlength=len(labels))
+    return {label: from_cents(int(total)) for label, total in zip(labels, sums)}
+
+
+def convert_columns(cols: dict, to_currency: str) -> np.ndarray:
+    """Centavos de cada linha convertidos para `to_currency` (moedas desconhecidas ficam como estão)."""
+    matrix = rate_matrix()
+    if matrix.code_of(to_currency) == matrix.unknown:
+        return cols["cents"]
+    codes = matrix.codes_of(cols["currency"], cols["currency_labels"])
+    return matrix.convert_many(cols["cents"], codes, to_currency)
+
+
+def summarize(transactions, to_currency: str = None, amount_key: str = "amount",
+              default_category: str = "Outros", unknown_as_expense: bool = False) -> dict:
+    """
+    Calcula, numa passada vetorizada:
+    - balance, income, expense (convertidos para to_currency, se informado)
+    - by_category / expense_by_category: totais por categoria
+    - by_month: {"AAAA-MM": {"income": x, "expense": y}}
+    - by_currency: soma líquida (receitas - despesas) na moeda original
+    Tipos desconhecidos não entram no saldo nem nos totais de receita/despesa, a não ser
+    com unknown_as_expense (como o saldo do dashboard, que desconta todo tipo que não é receita).
+    default_category: rótulo das transações sem categoria.
+    """
+    cols = to_columns(transactions, amount_key, default_category, unknown_as_expense)
+    cents = convert_columns(cols, to_currency) if to_currency else cols["cents"]
+
+    sign = cols["sign"]
+    income_values = np.where(sign == 1, cents, 0)
+    expense_values = np.where(sign == -1, cents, 0)
+
+    months = cols["month_labels"]
+    month_income = _group_sum(cols["month"], months, income_values)
+    month_expense = _group_sum(cols["month"], months, expense_values)
+    by_month = {
+        m: {"income": month_income.get(m, 0.0), "expense": month_expense.get(m, 0.0)}
+        for m in sorted(month_income) if m
+    }
+
+    income = int(income_values.sum())
+    expense = int(expense_values.sum())
+    return {
+        "count": len(cents),
+        "income": from_cents(income),
+        "expense": from_cents(expense),
+        "balance": from_cents(income - expense),
+        "by_category": _group_sum(cols["category"], cols["category_labels"], cents),
+        "expense_by_category": {
+            k: v for k, v in _group_sum(cols["category"], cols["category_labels"], expense_values).items() if v
+        },
+        "by_month": by_month,
+        "by_currency": _group_sum(cols["currency"], cols["currency_labels"], cols["cents"] * sign),
+    }
+
+
+def _add_to(bucket: dict, key, cents: int):
+    # arredonda ao centavo para não acumular erro de float a cada delta
+    bucket[key] = round(bucket.get(key, 0.0) + from_cents(cents), 2)
+
+
+def apply_delta(summary: dict, old_tx=None, new_tx=None, to_currency: str = None,
+                amount_key: str = "amount", default_category: str = "Outros",
+                unknown_as_expense: bool = False) -> dict:
+    """
+    Atualiza um resultado de summarize() no lugar, em O(1), quando uma transação
+    é adicionada (old_tx=None), alterada ou removida (new_tx=None).
+    Use as mesmas opções (default_category, unknown_as_expense) do summarize() original.
+    """
+    matrix = rate_matrix()
+    for tx, direction in ((old_tx, -1), (new_tx, 1)):
+        if tx is None:
+            continue
+        if tx.__class__ is Transaction and amount_key == "amount":
+            raw = tx.amount_cents
+        else:
+            raw = to_cents(tx.get(amount_key))
+        currency = tx.get("currency") or "BRL"
+        amount = matrix.convert(raw, currency, to_currency) if to_currency else raw
+        sign = _type_sign(tx.get("type"))
+        if sign == 0 and unknown_as_expense:
+            sign = -1
+        category = tx.get("category") or default_category
+        month = _tx_month(tx)
+
+        summary["count"] += direction
+        _add_to(summary["by_category"], category, direction * amount)
+        _add_to(summary["by_currency"], currency, direction * raw * sign)
+        if sign == 0:
+            continue
+        kind = "income" if sign > 0 else "expense"
+        _add_to(summary, kind, direction * amount)
+        if kind == "expense":
+            _add_to(summary["expense_by_category"], category, direction * amount)
+            if not summary["expense_by_category"][category]:
+                del summary["expense_by_category"][category]
+        if month:
+            totals = summary["by_month"].setdefault(month, {"income": 0.0, "expense": 0.0})
+            _add_to(totals, kind, direction * amount)
+
+    summary["balance"] = round(summary["income"] - summary["expense"], 2)
+    return summary
+
+
+# Benchmark: python -m logic.aggregation
+if __name__ == "__main__":
+    import random
+    import time
+
+    def _synthetic(n):
+        cats = ["Aluguel", "Alimentação", "Transporte", "Contas", "Lazer", "Salário"]
+        return [
+            {
+                "amount": round(random.uniform(1, 500), 2),
+                "type": random.choice(["entrada", "saída"]),
+                "category": random.choice(cats),
+                "currency": random.choice(["BRL", "USD", "EUR"]),
+                "date": f"{random.randint(1, 28):02d}/{random.randint(1, 12):02d}/2024",
+            }
+            for _ in range(n)
+        ]
+
+    for n in (10_000, 100_000, 1_000_000):
+        data = _synthetic(n)
+        start = time.perf_counter()
+        summarize(data, to_currency="BRL")
+        elapsed = time.perf_counter() - start
+        print(f"{n:>9} transações: {elapsed * 1000:8.1f} ms")
@@ -1,7 +1,32 @@
+import hashlib
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
-from database.data_manager import load_transactions
+import re
+import unicodedata
+
+import config
+from database.data_manager import load_cached_transactions
+from database.sqlite_manager import ai_cache_get, ai_cache_put
+from logic.ai_context import build_context, DEFAULT_TOKEN_BUDGET
+
+SYSTEM_PROMPT = "Você é um assistente financeiro do MoneyYOU. Responda sempre de forma clara e prática."
+
+
+def normalize_question(text: str) -> str:
+    """Minúsculas, sem acentos, pontuação nas pontas e espaços repetidos."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return re.sub(r"\s+", " ", text).strip(" ?!.,;:")
+
+
+def response_cache_key(user_message: str, context: str, model: str) -> str:
+    """
+    Chave do cache de respostas: pergunta normalizada + hash do resumo financeiro
+    (ver logic.ai_context) + modelo. Qualquer transação nova muda o resumo e,
+    com ele, a chave.
+    """
+    snapshot = hashlib.sha256((context or "").encode("utf-8")).hexdigest()
+    raw = f"{normalize_question(user_message)}|{snapshot}|{model}|{SYSTEM_PROMPT}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
 class AIAssistant:
@@ -10,8 +35,19 @@ class AIAssistant:
     Usa OpenAI GPT para responder perguntas do usuário sobre suas finanças.
     """
 
-    def __init__(self, model="gpt-4o-mini"):
+    def __init__(self, model="gpt-4o-mini", client=None, context_tokens: int = None, cache_enabled: bool = True):
         self.model = model
+        self.cache_enabled = cache_enabled
+        # Orçamento (tokens estimados) do contexto financeiro enviado em cada pergunta
+        self.context_tokens = context_tokens or getattr(config, "AI_CONTEXT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET)
+
+        if client is not None:
+            self.client = client  # ex.: cliente falso em medições
+            return
+
+        # Importados aqui para não pesar na inicialização do app
+        from openai import OpenAI
+        from dotenv import load_dotenv
 
         # 1️⃣ Carrega automaticamente o arquivo .env
         # Procura em logic/openai_key.env e config/openai_key.env
@@ -36,40 +72,113 @@ class AIAssistant:
             raise RuntimeError("❌ OPENAI_API_KEY não encontrado. Verifique o openai_key.env")
 
         # 3️⃣ Inicializa o cliente OpenAI
-        self.client = OpenAI(api_key=api_key)
+        # AI_BASE_URL (config) ou OPENAI_BASE_URL aponta para outro servidor compatível (ex.: um falso, local)
+        base_url = getattr(config, "AI_BASE_URL", None) or os.getenv("OPENAI_BASE_URL")
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
 
     # ------------------- Função principal -------------------
-    def ask(self, user_message: str, user_id: str) -> str:
+    @staticmethod
+    def _format_prompt(user_message: str, context: str) -> str:
+        if not context:
+            return f"💬 Pergunta do usuário: {user_message}"
+        return (
+            f"📊 Finanças do usuário:\n{context}\n\n"
+            f"💬 Pergunta do usuário: {user_message}"
+        )
+
+    def build_prompt(self, user_message: str, transactions) -> str:
+        """Pergunta + resumo das finanças do usuário (ver logic.ai_context), dentro do orçamento de tokens."""
+        return self._format_prompt(user_message, build_context(transactions, token_budget=self.context_tokens))
+
+    def _prepare(self, user_message: str, user_id: str, transactions):
+        """Retorna (mensagens, chave do cache de respostas)."""
+        if transactions is None:
+            transactions = load_cached_transactions(user_id, refresh=False)
+        context = build_context(transactions, token_budget=self.context_tokens)
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": self._format_prompt(user_message, context)},
+        ]
+        return messages, response_cache_key(user_message, context, self.model)
+
+    def ask(self, user_message: str, user_id: str, transactions=None) -> str:
         """
-        Pergunta à IA usando a mensagem do usuário e suas transações financeiras.
+        Pergunta à IA usando a mensagem do usuário e suas transações financeiras
+        (do cache local, se `transactions` não for informado).
+        Perguntas repetidas sobre os mesmos dados saem do cache de respostas.
         """
         try:
-            transactions = load_transactions(user_id=user_id)
-
-            if transactions:
-                user_prompt = (
-                    f"Você é um assistente financeiro do MoneyYOU.\n"
-                    f"📊 Transações do usuário:\n{transactions}\n\n"
-                    f"💬 Pergunta do usuário: {user_message}"
-                )
-            else:
-                user_prompt = f"💬 Pergunta do usuário: {user_message}"
+            messages, key = self._prepare(user_message, user_id, transactions)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
 
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "Você é um assistente financeiro do MoneyYOU. Responda sempre de forma clara e prática."},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=messages,
                 max_tokens=600,
                 temperature=0.6
             )
 
-            return response.choices[0].message.content.strip()
+            answer = response.choices[0].message.content.strip()
+            self._cache_put(key, answer)
+            return answer
 
         except Exception as e:
             return f"⚠️ Erro ao acessar a IA: {e}"
 
+    def ask_stream(self, user_message: str, user_id: str, transactions=None):
+        """
+        Como ask(), mas gera os pedaços de texto da resposta conforme chegam.
+        Erros são propagados (quem consome decide como exibi-los).
+        Só respostas recebidas por inteiro vão para o cache.
+        """
+        messages, key = self._prepare(user_message, user_id, transactions)
+        cached = self._cache_get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=600,
+            temperature=0.6,
+            stream=True,
+        )
+        parts = []
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()  # libera a conexão se o consumidor parar no meio
+        self._cache_put(key, "".join(parts).strip())
+
+    # ------------------- Cache de respostas -------------------
+    def _cache_get(self, key):
+        if not self.cache_enabled:
+            return None
+        try:
+            return ai_cache_get(key, ttl=getattr(config, "AI_CACHE_TTL", 24 * 60 * 60))
+        except Exception as e:
+            print(f"[IA] Cache de respostas indisponível: {e}")
+            return None
+
+    def _cache_put(self, key, answer: str):
+        if not self.cache_enabled or not answer:
+            return
+        try:
+            ai_cache_put(key, answer, max_entries=getattr(config, "AI_CACHE_MAX_ENTRIES", 500))
+        except Exception as e:
+            print(f"[IA] Não foi possível guardar a resposta: {e}")
+
     # ------------------- Alias para Dashboard -------------------
     def reply(self, user_message: str, user_id: str) -> str:
         """
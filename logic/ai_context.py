@@ -0,0 +1,113 @@
+# logic/ai_context.py
+"""
+Contexto financeiro enviado ao assistente de IA.
+
+Em vez das transações cruas, o prompt leva resumos já agregados em tabelas
+compactas ("|" como separador), em ordem de prioridade:
+1. resumo geral (saldo, receitas, despesas, período)
+2. totais mensais (mais recentes primeiro)
+3. principais categorias de despesa
+4. últimas N transações
+Cada seção entra linha a linha até esgotar o orçamento de tokens.
+"""
+import heapq
+
+from logic.aggregation import summarize, _type_sign
+from logic.dates import from_epoch_day, transaction_day
+
+DEFAULT_TOKEN_BUDGET = 1500
+RECENT_ROWS = 30
+TOP_CATEGORIES = 8
+MONTHS = 12
+_DESC_MAX = 40
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa de tokens (~4 caracteres por token, suficiente para orçamento)."""
+    return (len(text) + 3) // 4
+
+
+def _money(value: float) -> str:
+    return f"{value:.2f}"
+
+
+class _Budget:
+    def __init__(self, tokens: int):
+        self.left = tokens
+        self.lines = []
+
+    def add(self, line: str) -> bool:
+        cost = estimate_tokens(line) + 1  # + quebra de linha
+        if cost > self.left:
+            return False
+        self.lines.append(line)
+        self.left -= cost
+        return True
+
+    def add_table(self, title: str, header: str, rows) -> int:
+        """Adiciona título, cabeçalho e tantas linhas quanto couberem; retorna quantas entraram."""
+        if not self.add(title):
+            return 0
+        if not self.add(header):
+            self.lines.pop()
+            return 0
+        added = 0
+        for row in rows:
+            if not self.add(row):
+                break
+            added += 1
+        if not added:
+            self.lines.pop()
+            self.lines.pop()
+        return added
+
+
+def build_context(transactions, token_budget: int = DEFAULT_TOKEN_BUDGET, currency: str = "BRL",
+                  recent_rows: int = RECENT_ROWS, top_categories: int = TOP_CATEGORIES,
+                  months: int = MONTHS) -> str:
+    """Monta o contexto das transações dentro de `token_budget` tokens (estimados)."""
+    if not transactions:
+        return ""
+
+    summary = summarize(transactions, to_currency=currency)
+    budget = _Budget(token_budget)
+
+    days = [d for d in (transaction_day(t) for t in transactions) if d is not None]
+    period = f"{from_epoch_day(min(days))} a {from_epoch_day(max(days))}" if days else "?"
+    budget.add(
+        f"Resumo ({currency}): {summary['count']} transações de {period}; "
+        f"receitas {_money(summary['income'])}; despesas {_money(summary['expense'])}; "
+        f"saldo {_money(summary['balance'])}"
+    )
+
+    by_month = sorted(summary["by_month"].items(), reverse=True)[:months]
+    budget.add_table(
+        "Totais mensais:", "mes|receitas|despesas|saldo",
+        (f"{m}|{_money(v['income'])}|{_money(v['expense'])}|{_money(v['income'] - v['expense'])}"
+         for m, v in by_month),
+    )
+
+    expenses = summary["expense_by_category"]
+    total_expense = summary["expense"] or 1.0
+    top = heapq.nlargest(top_categories, expenses.items(), key=lambda kv: kv[1])
+    budget.add_table(
+        "Maiores categorias de despesa:", "categoria|total|%",
+        (f"{c}|{_money(v)}|{100 * v / total_expense:.0f}" for c, v in top),
+    )
+
+    recent = heapq.nlargest(recent_rows, transactions, key=lambda t: transaction_day(t) or -1)
+    budget.add_table(
+        "Últimas transações (valores na moeda original):", "data|tipo|categoria|valor|moeda|descrição",
+        (
+            "|".join([
+                str(t.get("date", "")),
+                "+" if _type_sign(t.get("type")) > 0 else "-",
+                str(t.get("category") or ""),
+                _money(float(t.get("amount") or 0)),
+                str(t.get("currency") or "BRL"),
+                str(t.get("desc") or "")[:_DESC_MAX].replace("|", "/").replace("\n", " "),
+            ])
+            for t in recent
+        ),
+    )
+    return "\n".join(budget.lines)
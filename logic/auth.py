@@ -4,7 +4,6 @@ import sqlite3
 import hashlib
 import datetime
 from typing import Tuple
-from logic.firebase import db  # Cliente Firestore
 
 # Detecta se está rodando empacotado (PyInstaller)
 IS_FROZEN = getattr(sys, 'frozen', False)
@@ -23,6 +22,11 @@ MIN_PASSWORD_LENGTH = 6
 # -------------------------------
 # Funções auxiliares
 # -------------------------------
+def _db():
+    """Cliente Firestore, importado só no primeiro uso (não atrasa a tela de login)."""
+    from database.firestore_client import get_db
+    return get_db()
+
 def connect():
     return sqlite3.connect(DB_PATH)
 
@@ -41,7 +45,7 @@ def validate_login(username: str, password: str) -> bool:
     hashed = hash_password(password)
 
     # Firebase
-    doc = db.collection("users").document(username).get()
+    doc = _db().collection("users").document(username).get()
     if doc.exists:
         return verify_password(password, doc.to_dict().get("password"))
 
@@ -70,7 +74,7 @@ def validate_registration(username: str, password: str, confirm_password: str, e
         return False, "Email inválido."
 
     # Verifica Firebase
-    if db.collection("users").document(username).get().exists:
+    if _db().collection("users").document(username).get().exists:
         return False, "Usuário já existe."
     # Verifica SQLite
     try:
@@ -101,7 +105,7 @@ def register_user(username: str, password: str, email: str, role: str = "user")
 
     try:
         # Firebase
-        db.collection("users").document(username).set(user_data)
+        _db().collection("users").document(username).set(user_data)
         print(f"[Firebase] Usuário '{username}' criado.")
 
         # SQLite
@@ -140,7 +144,7 @@ def change_password(username: str, email: str, new_password: str) -> bool:
 
     try:
         # Firebase
-        doc_ref = db.collection("users").document(username)
+        doc_ref = _db().collection("users").document(username)
         doc = doc_ref.get()
         if doc.exists:
             user_data = doc.to_dict()
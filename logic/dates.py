@@ -0,0 +1,71 @@
+# logic/dates.py
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+# Representação canônica das datas de transação: dias desde 01/01/1970 (int),
+# gravada no campo "date_day". Filtros e ordenações comparam esse inteiro.
+DATE_DAY_FIELD = "date_day"
+
+_EPOCH = date(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+# Formatos aceitos no campo "date": "aaaa-mm-dd" e "dd/mm/aaaa"
+_ISO_RE = re.compile(r"^\s*(\d{4})-(\d{1,2})-(\d{1,2})")
+_BR_RE = re.compile(r"^\s*(\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+def epoch_day(d) -> int:
+    """Converte date/datetime em dias desde 1970-01-01."""
+    if isinstance(d, datetime):
+        d = d.date()
+    return d.toordinal() - _EPOCH_ORDINAL
+
+
+def from_epoch_day(day: int) -> date:
+    return _EPOCH + timedelta(days=day)
+
+
+@lru_cache(maxsize=8192)
+def _parse_str(value: str) -> Optional[int]:
+    m = _ISO_RE.match(value)
+    if m:
+        y, mo, d = m.groups()
+    else:
+        m = _BR_RE.match(value)
+        if not m:
+            return None
+        d, mo, y = m.groups()
+    try:
+        return date(int(y), int(mo), int(d)).toordinal() - _EPOCH_ORDINAL
+    except ValueError:
+        return None
+
+
+def parse_epoch_day(value) -> Optional[int]:
+    """
+    Converte uma data ("aaaa-mm-dd", "dd/mm/aaaa", date ou datetime) em epoch-day.
+    Retorna None se não for reconhecida.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (date, datetime)):
+        return epoch_day(value)
+    if isinstance(value, int):
+        return value
+    return _parse_str(str(value))
+
+
+def transaction_day(tx: dict) -> Optional[int]:
+    """Epoch-day da transação (usa "date_day" se já calculado)."""
+    day = tx.get(DATE_DAY_FIELD)
+    if day is not None:
+        return day
+    return parse_epoch_day(tx.get("date"))
+
+
+def normalize_transaction(tx: dict) -> dict:
+    """Calcula e grava "date_day" a partir de "date" (uma vez, na entrada dos dados)."""
+    tx[DATE_DAY_FIELD] = parse_epoch_day(tx.get("date"))
+    return tx
@@ -28,18 +28,16 @@ class FinanceLogic:
     def convert_currency(self, amount: float, from_currency: str, to_currency: str) -> float:
         """
         Converte um valor de uma moeda para outra usando as taxas de câmbio.
+        O cálculo é feito em centavos (logic.money), com resultado arredondado ao centavo.
         """
         if from_currency not in self.exchange_rates:
             raise ValueError(f"Moeda de origem inválida: {from_currency}")
         if to_currency not in self.exchange_rates:
             raise ValueError(f"Moeda de destino inválida: {to_currency}")
 
-        # Converte para BRL (base)
-        amount_in_brl = amount / self.exchange_rates[from_currency]
-
-        # Converte para moeda de destino
-        converted = amount_in_brl * self.exchange_rates[to_currency]
-        return converted
+        from logic.money import convert_cents, from_cents
+        from logic.transaction import to_cents
+        return from_cents(convert_cents(to_cents(amount), from_currency, to_currency))
 
     def format_currency(self, amount: float, currency: str) -> str:
         """
@@ -62,4 +60,5 @@ class FinanceLogic:
         """
         if from_currency not in self.exchange_rates or to_currency not in self.exchange_rates:
             raise ValueError("Moeda inválida")
-        return self.exchange_rates[to_currency] / self.exchange_rates[from_currency]
+        from logic.money import rate_matrix
+        return rate_matrix().factor(from_currency, to_currency)
@@ -1,47 +1,226 @@
-import os
-import sys
-import firebase_admin
-from firebase_admin import credentials, firestore
-from database.data_manager import load_transactions
-
-def resource_path(relative_path: str) -> str:
-    """Obter caminho absoluto do recurso (compatível com PyInstaller)."""
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-# Caminho para a chave do Firebase
-FIREBASE_KEY_PATH = resource_path("config/firebase_key.json")
-
-# Inicializa Firebase apenas uma vez
-if not firebase_admin._apps:
-    cred = credentials.Certificate(FIREBASE_KEY_PATH)
-    firebase_admin.initialize_app(cred)
-    print("[Firebase] Inicializado com sucesso.")
-
-# Cliente Firestore
-db = firestore.client()
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from firebase_admin import firestore
+from database.firestore_client import get_db
+from database.data_manager import load_cached_transactions
+from database.sqlite_manager import (
+    outbox_peek, outbox_ack, outbox_mark_failed, outbox_dead_letter, outbox_wakeup, outbox_count
+)
 
 def send_transaction_to_firebase(transaction: dict) -> dict:
     """Envia uma transação para o Firestore."""
     try:
-        doc_ref = db.collection("transactions").document(str(transaction.get("id")))
+        doc_ref = get_db().collection("transactions").document(str(transaction.get("id")))
         doc_ref.set(transaction)
         return {"status": "success", "message": f"Transação {transaction.get('id')} enviada com sucesso."}
     except Exception as e:
         return {"status": "error", "message": f"Erro ao enviar transação: {e}"}
 
-def sync_transactions_to_firebase(user_id: str) -> dict:
-    """Sincroniza todas as transações locais de um usuário para o Firestore."""
+# Limite de operações por commit imposto pelo Firestore
+MAX_BATCH_SIZE = 500
+
+def _is_transient(error) -> bool:
+    """Falhas de rede/servidor: a escrita fica na fila e é repetida sem limite."""
+    from google.api_core import exceptions as gexc
+    return isinstance(error, (
+        gexc.ServiceUnavailable, gexc.DeadlineExceeded, gexc.InternalServerError,
+        gexc.TooManyRequests, gexc.ResourceExhausted, gexc.Aborted, gexc.RetryError, OSError,
+    ))
+
+
+def _is_permanent(error) -> bool:
+    """Recusas que não mudam repetindo (regras, documento inválido, pré-condição)."""
+    from google.api_core import exceptions as gexc
+    return isinstance(error, (
+        gexc.PermissionDenied, gexc.InvalidArgument, gexc.FailedPrecondition,
+        gexc.NotFound, gexc.AlreadyExists, ValueError, TypeError,
+    ))
+
+def _commit_chunk(chunk, max_retries: int, base_delay: float):
+    """
+    Grava um bloco de operações num único WriteBatch (atômico).
+    Em falha, repete o bloco inteiro com backoff exponencial + jitter; recusas
+    definitivas (_is_permanent) não são repetidas.
+    Cada operação é uma tupla (op, doc_id, dados) com op em "set", "merge", "update" ou "delete".
+    """
+    db = get_db()
+    collection = db.collection("transactions")
+    for attempt in range(max_retries + 1):
+        batch = db.batch()
+        for op, doc_id, data in chunk:
+            doc_ref = collection.document(str(doc_id))
+            if op == "delete":
+                batch.delete(doc_ref)
+            elif op == "update":
+                batch.update(doc_ref, data)
+            elif op == "merge":
+                batch.set(doc_ref, data, merge=True)
+            else:
+                batch.set(doc_ref, data)
+        try:
+            batch.commit()
+            return
+        except Exception as e:
+            if attempt == max_retries or _is_permanent(e):
+                raise
+            time.sleep(base_delay * (2 ** attempt) + random.uniform(0, base_delay))
+
+def bulk_write(operations: list, chunk_size: int = MAX_BATCH_SIZE, max_workers: int = 4,
+               max_retries: int = 3, base_delay: float = 0.5, progress_callback=None) -> dict:
+    """
+    Executa muitas operações no Firestore em blocos de até 500, com commits em paralelo.
+    progress_callback(concluídas, total) é chamado (na thread que chamou) a cada bloco.
+    Retorna {"written": n, "failed": n, "errors": [...], "failed_ops": [...]}.
+    """
+    chunk_size = max(1, min(chunk_size, MAX_BATCH_SIZE))
+    chunks = [operations[i:i + chunk_size] for i in range(0, len(operations), chunk_size)]
+    total = len(operations)
+    result = {"written": 0, "failed": 0, "errors": [], "failed_ops": []}
+    if not chunks:
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_commit_chunk, chunk, max_retries, base_delay): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                future.result()
+                result["written"] += len(chunk)
+            except Exception as e:
+                result["failed"] += len(chunk)
+                result["failed_ops"].extend(chunk)
+                result["errors"].append(str(e))
+            if progress_callback:
+                progress_callback(result["written"] + result["failed"], total)
+
+    return result
+
+def sync_transactions_to_firebase(user_id: str, progress_callback=None,
+                                  chunk_size: int = MAX_BATCH_SIZE, max_workers: int = 4) -> dict:
+    """
+    Sincroniza todas as transações locais de um usuário para o Firestore,
+    em lotes de até 500 escritas por commit (ver bulk_write).
+    """
     try:
-        transactions = load_transactions(user_id=user_id)
+        transactions = load_cached_transactions(user_id, refresh=False)
         if not transactions:
             return {"status": "warning", "message": "Nenhuma transação para sincronizar."}
+
+        operations = []
         for t in transactions:
-            doc_ref = db.collection("transactions").document(str(t["id"]))
-            doc_ref.set(t)
-        return {"status": "success", "message": f"{len(transactions)} transações sincronizadas."}
+            data = dict(t)
+            data["updated_at"] = firestore.SERVER_TIMESTAMP
+            operations.append(("set", t["id"], data))
+
+        result = bulk_write(
+            operations,
+            chunk_size=chunk_size,
+            max_workers=max_workers,
+            progress_callback=progress_callback,
+        )
+        if result["failed"]:
+            return {
+                "status": "error",
+                "message": f"{result['written']} transações sincronizadas, {result['failed']} falharam: "
+                           f"{result['errors'][0]}",
+            }
+        return {"status": "success", "message": f"{result['written']} transações sincronizadas."}
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+# ========================
+# Fila de saída (outbox)
+# ========================
+# Erros desconhecidos: depois de tantas tentativas o lote é enviado escrita a
+# escrita e a que continuar falhando sai da fila (outbox_dead)
+OUTBOX_MAX_ATTEMPTS = 5
+
+
+def _outbox_operation(op, doc_id, data):
+    if op != "delete":
+        data = dict(data or {})
+        data["updated_at"] = firestore.SERVER_TIMESTAMP
+    return op, doc_id, data
+
+
+def _flush_one_by_one(pending, max_retries: int) -> int:
+    """Envia cada escrita num commit próprio, em ordem; as recusadas vão para outbox_dead."""
+    sent = 0
+    for seq, op, doc_id, data in pending:
+        try:
+            _commit_chunk([_outbox_operation(op, doc_id, data)], max_retries, base_delay=0.5)
+        except Exception as e:
+            if _is_transient(e):
+                outbox_mark_failed([seq])
+                raise
+            outbox_dead_letter([seq], f"{type(e).__name__}: {e}")
+            print(f"[Firebase] Escrita {op} de {doc_id} recusada e retirada da fila: {e}")
+            continue
+        outbox_ack([seq])
+        sent += 1
+    return sent
+
+
+def flush_outbox(max_retries: int = 1) -> int:
+    """
+    Envia as escritas pendentes da fila local ao Firestore, em ordem e em lotes de até 500.
+    Falha de rede: para e o lote continua na fila para a próxima tentativa.
+    Recusa definitiva (ou OUTBOX_MAX_ATTEMPTS falhas): o lote é reenviado escrita a
+    escrita e só a recusada sai da fila, para não travar as seguintes.
+    Retorna quantas escritas foram confirmadas.
+    """
+    sent = 0
+    while True:
+        pending = outbox_peek(MAX_BATCH_SIZE)
+        if not pending:
+            return sent
+
+        operations = [_outbox_operation(op, doc_id, data) for _seq, op, doc_id, data in pending]
+        seqs = [p[0] for p in pending]
+        try:
+            _commit_chunk(operations, max_retries, base_delay=0.5)
+        except Exception as e:
+            attempts = outbox_mark_failed(seqs)
+            if _is_transient(e) or (not _is_permanent(e) and attempts < OUTBOX_MAX_ATTEMPTS):
+                raise
+            sent += _flush_one_by_one(pending, max_retries=0)
+            continue
+        outbox_ack(seqs)
+        sent += len(seqs)
+
+_flusher_thread = None
+
+def start_outbox_flusher(interval: float = 5.0, max_backoff: float = 60.0):
+    """
+    Inicia (uma vez) a thread que esvazia a fila de saída em segundo plano.
+    Acorda a cada nova escrita enfileirada ou a cada `interval` segundos;
+    sem conexão, espera cada vez mais (até `max_backoff`).
+    """
+    global _flusher_thread
+    if _flusher_thread is not None and _flusher_thread.is_alive():
+        return _flusher_thread
+
+    def _run():
+        delay = interval
+        while True:
+            outbox_wakeup.wait(delay)
+            outbox_wakeup.clear()
+            try:
+                flush_outbox()
+                delay = interval
+            except Exception as e:
+                delay = min(delay * 2, max_backoff)
+                try:
+                    pending = outbox_count()
+                except Exception:
+                    pending = "?"  # a thread não pode morrer por causa da mensagem
+                print(f"[Firebase] Sem conexão, {pending} escritas na fila; nova tentativa em {delay:.0f}s: {e}")
+
+    _flusher_thread = threading.Thread(target=_run, name="outbox-flusher", daemon=True)
+    _flusher_thread.start()
+    return _flusher_thread
@@ -0,0 +1,25 @@
+# logic/lazy_imports.py
+"""
+Nomes reexportados por um pacote e importados só no primeiro acesso.
+
+Usado para os módulos pesados (Firebase, matplotlib) que não devem ser
+carregados antes da tela de login.
+"""
+import importlib
+import sys
+
+
+def lazy_attrs(package: str, attrs: dict):
+    """
+    Retorna um __getattr__ de módulo para o pacote `package`.
+    attrs: {nome: submódulo relativo (ex.: ".dashboard")}
+    """
+    def __getattr__(name):
+        module = attrs.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        setattr(sys.modules[package], name, value)  # próximos acessos não passam por aqui
+        return value
+
+    return __getattr__
@@ -0,0 +1,113 @@
+# logic/money.py
+"""
+Aritmética de dinheiro em centavos inteiros.
+
+Valores circulam como inteiros na menor unidade (centavos) e a conversão usa
+uma matriz moeda x moeda de fatores, montada uma vez a partir de
+FinanceLogic.exchange_rates (e refeita só se as taxas mudarem). Um vetor
+inteiro de valores é convertido numa única operação NumPy, com arredondamento
+para o centavo; as somas seguintes são de inteiros, sem erro acumulado.
+Moedas desconhecidas não são convertidas (fator 1), como em logic.aggregation.
+"""
+import threading
+
+import numpy as np
+
+from logic.finance_logic import FinanceLogic
+
+CENTS = 100
+
+
+def from_cents(cents) -> float:
+    return cents / CENTS
+
+
+class RateMatrix:
+    """
+    factors[i, j] = quanto 1 unidade da moeda i vale na moeda j.
+    O último código (len(currencies)) representa moedas desconhecidas.
+    """
+
+    def __init__(self, rates: dict):
+        self.currencies = list(rates)
+        self.codes = {c: i for i, c in enumerate(self.currencies)}
+        self.unknown = len(self.currencies)
+        per_brl = np.array([rates[c] for c in self.currencies] + [1.0], dtype=np.float64)
+        self.factors = per_brl[np.newaxis, :] / per_brl[:, np.newaxis]
+        # desconhecida -> qualquer uma (e vice-versa) fica como está
+        self.factors[self.unknown, :] = 1.0
+        self.factors[:, self.unknown] = 1.0
+
+    def code_of(self, currency) -> int:
+        return self.codes.get(currency, self.unknown)
+
+    def factor(self, from_currency, to_currency) -> float:
+        return float(self.factors[self.code_of(from_currency), self.code_of(to_currency)])
+
+    def convert(self, cents: int, from_currency, to_currency) -> int:
+        """Converte um valor em centavos (arredonda para o centavo mais próximo)."""
+        if from_currency == to_currency:
+            return cents
+        return int(round(cents * self.factors[self.code_of(from_currency), self.code_of(to_currency)]))
+
+    def convert_many(self, cents: np.ndarray, currency_codes: np.ndarray, to_currency) -> np.ndarray:
+        """
+        Converte um vetor de centavos (int64) de uma vez.
+        currency_codes: código de origem de cada linha (ver code_of / codes_of).
+        """
+        factors = self.factors[:, self.code_of(to_currency)][currency_codes]
+        return np.rint(cents * factors).astype(np.int64)
+
+    def codes_of(self, codes: np.ndarray, labels: list) -> np.ndarray:
+        """Traduz códigos locais (índices em `labels`) para os códigos da matriz."""
+        table = np.array([self.code_of(c) for c in labels] or [self.unknown], dtype=np.intp)
+        return table[codes]
+
+
+_matrix = None
+_matrix_rates = None
+_matrix_lock = threading.Lock()
+
+
+def rate_matrix() -> RateMatrix:
+    """Matriz das taxas atuais (reaproveitada enquanto FinanceLogic.exchange_rates não mudar)."""
+    global _matrix, _matrix_rates
+    rates = tuple(FinanceLogic.exchange_rates.items())
+    if rates != _matrix_rates:
+        with _matrix_lock:
+            if rates != _matrix_rates:
+                _matrix = RateMatrix(dict(rates))
+                _matrix_rates = rates
+    return _matrix
+
+
+def convert_cents(cents: int, from_currency, to_currency) -> int:
+    return rate_matrix().convert(cents, from_currency, to_currency)
+
+
+# Benchmark: python -m logic.money
+if __name__ == "__main__":
+    import random
+    import time
+
+    from logic.transaction import to_cents
+
+    currencies = list(FinanceLogic.exchange_rates)
+    n = 1_000_000
+    amounts = [round(random.uniform(1, 500), 2) for _ in range(n)]
+    origin = [random.choice(currencies) for _ in range(n)]
+
+    finance = FinanceLogic()
+    start = time.perf_counter()
+    per_row = sum(finance.convert_currency(a, c, "BRL") for a, c in zip(amounts, origin))
+    per_row_ms = (time.perf_counter() - start) * 1000
+
+    matrix = rate_matrix()
+    cents = np.array([to_cents(a) for a in amounts], dtype=np.int64)
+    codes = np.array([matrix.code_of(c) for c in origin], dtype=np.intp)
+    start = time.perf_counter()
+    total = int(matrix.convert_many(cents, codes, "BRL").sum())
+    vector_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{n} conversões: por linha {per_row_ms:.0f} ms | vetorizado {vector_ms:.1f} ms")
+    print(f"total: float {per_row:.4f} | centavos {from_cents(total):.2f}")
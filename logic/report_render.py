@@ -0,0 +1,32 @@
+# logic/report_render.py
+"""
+Renderização dos gráficos de relatório em PNG.
+
+Roda no processo auxiliar de logic.reports: usa só Figure + canvas Agg (sem
+pyplot nem estado global) e importa apenas o matplotlib.
+"""
+from io import BytesIO
+
+
+def render_pie_png(totals, colors, title: str = "Distribuição de Despesas") -> bytes:
+    """totals: [(categoria, valor)] -> bytes do PNG."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(5, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.pie(
+        [value for _, value in totals],
+        labels=[category for category, _ in totals],
+        autopct="%.1f%%",
+        colors=colors[:len(totals)],
+        startangle=140,
+        textprops={"fontsize": 9, "color": "white"},
+        wedgeprops={"linewidth": 1, "edgecolor": "white"},
+    )
+    ax.set_title(title, fontsize=12, weight="bold", color="#1E1E1E")
+
+    buf = BytesIO()
+    fig.savefig(buf, format="png", transparent=True, bbox_inches="tight")
+    return buf.getvalue()
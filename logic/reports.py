@@ -1,33 +1,31 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import hashlib
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
 
+from logic.aggregation import summarize
+from logic.report_render import render_pie_png
+
+# Paleta de cores institucionais (MoneyYOU)
+PIE_COLORS = ("#7C3AED", "#A855F7", "#1E1E1E", "#6366F1", "#F97316")
+
+# Limite de memória das imagens em cache
+PNG_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
 
 def generate_monthly_report(transactions):
     """
     Generates a basic monthly report of transactions.
     """
-    total_income = 0.0
-    total_expenses = 0.0
-
-    for transaction in transactions:
-        value = transaction.get('value', 0)
-        try:
-            value = float(value)
-        except (ValueError, TypeError):
-            value = 0.0
-
-        if transaction.get('type') == 'income':
-            total_income += value
-        elif transaction.get('type') == 'expense':
-            total_expenses += value
-
-    balance = total_income - total_expenses
+    summary = summarize(transactions, amount_key='value')
 
     return {
-        'total_income': total_income,
-        'total_expenses': total_expenses,
-        'balance': balance
+        'total_income': summary['income'],
+        'total_expenses': summary['expense'],
+        'balance': summary['balance']
     }
 
 
@@ -35,58 +33,129 @@ def calculate_totals_by_category(transactions):
     """
     Calculates totals grouped by category.
     """
-    category_totals = {}
+    return summarize(transactions, amount_key='value', default_category='Others')['by_category']
 
-    for transaction in transactions:
-        category = transaction.get('category', 'Others')
-        value = transaction.get('value', 0)
-        try:
-            value = float(value)
-        except (ValueError, TypeError):
-            value = 0.0
 
-        category_totals[category] = category_totals.get(category, 0.0) + value
+# ========================
+# Cache LRU de PNGs
+# ========================
+class PngCache:
+    """LRU limitado pelo total de bytes das imagens guardadas."""
 
-    return category_totals
+    def __init__(self, max_bytes: int = PNG_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
 
+    def get(self, key):
+        with self._lock:
+            png = self._items.get(key)
+            if png is not None:
+                self._items.move_to_end(key)
+            return png
+
+    def put(self, key, png: bytes):
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = png
+            self._size += len(png)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+_png_cache = PngCache()
 
-def generate_pie_chart(transactions):
-    """
-    Generates a pie chart of expenses grouped by category.
-    Returns a BytesIO buffer with the PNG image (to be used in Qt).
-    """
-    # Filtrar apenas despesas
-    expenses = [t for t in transactions if t.get("type") == "expense"]
 
-    if not expenses:
-        return None
+def _cache_key(totals, colors) -> str:
+    raw = repr((tuple((c, round(v, 2)) for c, v in totals), tuple(colors)))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
-    df = pd.DataFrame(expenses)
 
-    # Agrupar por categoria
-    df_grouped = df.groupby("category")["value"].sum().reset_index()
+# ========================
+# Processo de renderização
+# ========================
+_executor = None
+_executor_lock = threading.Lock()
 
-    # Paleta de cores institucionais (MoneyYOU)
-    colors = ["#7C3AED", "#A855F7", "#1E1E1E", "#6366F1", "#F97316"]
 
-    # Criar gráfico
-    fig, ax = plt.subplots(figsize=(5, 5))
-    wedges, texts, autotexts = ax.pie(
-        df_grouped["value"],
-        labels=df_grouped["category"],
-        autopct="%.1f%%",
-        colors=colors[:len(df_grouped)],
-        startangle=140,
-        textprops={"fontsize": 9, "color": "white"},
-        wedgeprops={"linewidth": 1, "edgecolor": "white"},
-    )
+def _render_executor() -> ProcessPoolExecutor:
+    """Processo auxiliar (criado no primeiro relatório) que desenha com o backend Agg."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # "spawn": não herda threads/estado do Qt do processo principal
+            _executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
 
-    ax.set_title("Distribuição de Despesas", fontsize=12, weight="bold", color="#1E1E1E")
 
-    # Exportar para buffer
-    buf = BytesIO()
-    plt.savefig(buf, format="png", transparent=True, bbox_inches="tight")
-    plt.close(fig)
+def _discard_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
 
-    buf.seek(0)
-    return buf
+
+def shutdown_renderer():
+    """Encerra o processo auxiliar e esvazia o cache de PNGs (chamado ao sair do app)."""
+    _discard_executor()
+    _png_cache.clear()
+
+
+def expense_totals(transactions):
+    """[(categoria, total)] das despesas, em ordem alfabética (ordem estável para o hash)."""
+    by_category = summarize(transactions, amount_key='value')['expense_by_category']
+    return sorted(by_category.items())
+
+
+def render_pie_chart_async(transactions, colors=PIE_COLORS) -> Future:
+    """
+    Agenda o gráfico de pizza das despesas por categoria no processo auxiliar.
+    Retorna um Future com um BytesIO (PNG) ou None se não houver despesas.
+    Gráficos já gerados (mesmos totais e paleta) saem do cache na hora.
+    """
+    totals = expense_totals(transactions)
+    future = Future()
+    if not totals:
+        future.set_result(None)
+        return future
+
+    key = _cache_key(totals, colors)
+    png = _png_cache.get(key)
+    if png is not None:
+        future.set_result(BytesIO(png))
+        return future
+
+    def _done(render_future):
+        try:
+            png = render_future.result()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                _discard_executor()  # o próximo relatório cria um processo novo
+            future.set_exception(e)
+            return
+        _png_cache.put(key, png)
+        future.set_result(BytesIO(png))
+
+    _render_executor().submit(render_pie_png, totals, list(colors)).add_done_callback(_done)
+    return future
+
+
+def generate_pie_chart(transactions):
+    """
+    Generates a pie chart of expenses grouped by category.
+    Returns a BytesIO buffer with the PNG image (to be used in Qt).
+    Blocks until the image is ready; on the GUI thread prefer render_pie_chart_async.
+    """
+    return render_pie_chart_async(transactions).result()
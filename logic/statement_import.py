@@ -0,0 +1,299 @@
+# logic/statement_import.py
+"""
+Importação de extratos bancários (CSV e OFX).
+
+Os arquivos são lidos em streaming e cada lançamento vira um dict no formato
+de data_manager.add_transaction. Lançamentos que já existem (mesmo hash de
+conteúdo: data, valor, tipo e descrição) são ignorados, e os novos são
+gravados em lotes (data_manager.add_transactions).
+
+Uso: python -m logic.statement_import <arquivo> <user_id>
+"""
+import csv
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+from logic.dates import from_epoch_day, parse_epoch_day
+
+BATCH_SIZE = 1000
+
+# Nomes de coluna aceitos no CSV (comparados sem acento e em minúsculas)
+CSV_COLUMNS = {
+    "date": ["data", "date", "data lancamento", "data de lancamento", "data movimento", "data da transacao"],
+    "desc": ["descricao", "description", "historico", "memo", "lancamento", "estabelecimento", "name", "payee"],
+    "amount": ["valor", "amount", "value", "valor (r$)", "quantia"],
+    "credit": ["credito", "credit", "entrada"],
+    "debit": ["debito", "debit", "saida"],
+    "type": ["tipo", "type"],
+    "category": ["categoria", "category"],
+    "currency": ["moeda", "currency"],
+}
+
+# Valores da coluna "tipo" reconhecidos (sem acento, minúsculas); os demais
+# ("Compra", "PIX", "TED"...) não dizem a direção e o sinal do valor decide
+INCOME_LABELS = {"entrada", "receita", "credito", "credit", "c", "income", "deposito"}
+EXPENSE_LABELS = {"saida", "despesa", "debito", "debit", "d", "expense"}
+
+_AMOUNT_CLEAN_RE = re.compile(r"[^\d,.\-]")
+_OFX_TOKEN_RE = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def _plain(text) -> str:
+    """Minúsculas, sem acentos e sem espaços extras."""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    return " ".join("".join(c for c in text if not unicodedata.combining(c)).lower().split())
+
+
+def parse_amount(value):
+    """
+    Converte valores como "1.234,56", "1,234.56", "-50", "(50,00)" ou "150,00 D" em float.
+    Retorna None se não houver número.
+    """
+    text = str(value or "").strip()
+    if not text:
+        return None
+    negative = text.startswith("(") and text.endswith(")")
+    upper = text.upper()
+    if upper.endswith(" D") or upper.endswith("-D"):
+        negative = True
+    text = _AMOUNT_CLEAN_RE.sub("", text)
+    if text.startswith("-"):
+        negative = True
+    text = text.replace("-", "")
+    if not text:
+        return None
+
+    if "," in text and "." in text:
+        # o último separador é o decimal
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        head, _, tail = text.rpartition(",")
+        text = f"{head.replace(',', '')}.{tail}" if len(tail) <= 2 else text.replace(",", "")
+    elif text.count(".") > 1:
+        text = text.replace(".", "")
+    try:
+        amount = float(text)
+    except ValueError:
+        return None
+    return -amount if negative else amount
+
+
+def _make_transaction(day, amount, desc, tx_type=None, category=None, currency=None):
+    """Monta o dict de transação; sem tipo reconhecido, o sinal do valor decide."""
+    t = _plain(tx_type)
+    if t in EXPENSE_LABELS:
+        tx_type = "saída"
+    elif t in INCOME_LABELS:
+        tx_type = "entrada"
+    else:
+        tx_type = "saída" if amount < 0 else "entrada"
+    return {
+        "date": from_epoch_day(day).strftime("%Y-%m-%d"),
+        "date_day": day,
+        "desc": " ".join(str(desc or "").split()) or "Sem descrição",
+        "amount": round(abs(amount), 2),
+        "type": tx_type,
+        "category": category or "Outros",
+        "currency": (currency or "BRL").upper(),
+        "recurrence": "Única",
+    }
+
+
+# ========================
+# CSV
+# ========================
+def _map_columns(header):
+    mapping = {}
+    for i, name in enumerate(header):
+        key = _plain(name)
+        for field, aliases in CSV_COLUMNS.items():
+            if field not in mapping and key in aliases:
+                mapping[field] = i
+    return mapping
+
+
+def iter_csv_statement(path, encoding: str = "utf-8-sig"):
+    """
+    Gera (transação, None) para cada linha válida do CSV, ou (None, motivo) para linhas ignoradas.
+    O separador (, ; tab |) é detectado pelo início do arquivo.
+    """
+    with open(path, newline="", encoding=encoding, errors="replace") as f:
+        sample = f.read(8192)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+
+        header = next(reader, None)
+        mapping = _map_columns(header or [])
+        if "date" not in mapping or not ({"amount", "credit", "debit"} & mapping.keys()):
+            raise ValueError(f"CSV sem colunas de data e valor reconhecidas: {header}")
+
+        def cell(row, field):
+            i = mapping.get(field)
+            return row[i] if i is not None and i < len(row) else None
+
+        for line_no, row in enumerate(reader, start=2):
+            if not any(row):
+                continue
+            day = parse_epoch_day(cell(row, "date"))
+            amount = parse_amount(cell(row, "amount"))
+            if amount is None:
+                credit = parse_amount(cell(row, "credit"))
+                debit = parse_amount(cell(row, "debit"))
+                if credit is not None or debit is not None:
+                    amount = (credit or 0.0) - abs(debit or 0.0)
+            if day is None or amount is None:
+                yield None, f"linha {line_no}: data ou valor inválido"
+                continue
+            yield _make_transaction(
+                day, amount, cell(row, "desc"),
+                tx_type=cell(row, "type"), category=cell(row, "category"), currency=cell(row, "currency"),
+            ), None
+
+
+# ========================
+# OFX
+# ========================
+def _iter_ofx_tokens(f, chunk_size: int = 65536):
+    """Gera (fechamento?, TAG, valor) lendo o arquivo em blocos (SGML ou XML, com ou sem quebras de linha)."""
+    buffer = ""
+    while True:
+        chunk = f.read(chunk_size)
+        buffer += chunk
+        # Só processa até o último "<": o token seguinte pode estar incompleto
+        cut = len(buffer) if not chunk else buffer.rfind("<")
+        if cut > 0:
+            for m in _OFX_TOKEN_RE.finditer(buffer, 0, cut):
+                yield m.group(1) == "/", m.group(2).upper(), m.group(3).strip()
+            buffer = buffer[cut:]
+        if not chunk:
+            return
+
+
+def _ofx_day(value):
+    digits = re.match(r"\s*(\d{4})(\d{2})(\d{2})", value or "")
+    if not digits:
+        return None
+    return parse_epoch_day("-".join(digits.groups()))
+
+
+def iter_ofx_statement(path, encoding: str = "latin-1"):
+    """Gera (transação, None) para cada <STMTTRN> do OFX, ou (None, motivo) para lançamentos inválidos."""
+    currency = None
+    current = None
+    with open(path, encoding=encoding, errors="replace") as f:
+        for closing, tag, value in _iter_ofx_tokens(f):
+            if tag == "CURDEF" and value:
+                currency = value
+            elif tag == "STMTTRN":
+                if not closing:
+                    current = {}
+                    continue
+                if current is None:
+                    continue
+                day = _ofx_day(current.get("DTPOSTED"))
+                amount = parse_amount(current.get("TRNAMT"))
+                if day is None or amount is None:
+                    yield None, f"lançamento {current.get('FITID', '?')}: data ou valor inválido"
+                else:
+                    desc = current.get("MEMO") or current.get("NAME")
+                    if current.get("NAME") and current.get("MEMO") and current["NAME"] != current["MEMO"]:
+                        desc = f"{current['NAME']} - {current['MEMO']}"
+                    yield _make_transaction(day, amount, desc, currency=currency), None
+                current = None
+            elif current is not None and not closing and value:
+                current[tag] = value
+
+
+def iter_statement(path):
+    """Escolhe o leitor pela extensão (.ofx/.qfx = OFX, demais = CSV)."""
+    if Path(path).suffix.lower() in (".ofx", ".qfx"):
+        return iter_ofx_statement(path)
+    return iter_csv_statement(path)
+
+
+# ========================
+# Deduplicação e gravação
+# ========================
+def content_hash(tx: dict) -> str:
+    """Hash do conteúdo (data, valor em centavos, tipo, descrição) usado para achar duplicatas."""
+    day = tx.get("date_day")
+    if day is None:
+        day = parse_epoch_day(tx.get("date"))
+    cents = round(abs(parse_amount(tx.get("amount")) or 0.0) * 100)
+    tx_type = "saida" if _plain(tx.get("type")) in ("saida", "despesa", "expense") else "entrada"
+    key = f"{day}|{cents}|{tx_type}|{_plain(tx.get('desc'))}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def import_statement(path, user_id: str, batch_size: int = BATCH_SIZE, progress_callback=None) -> dict:
+    """
+    Importa o extrato para o usuário.
+    Lançamentos idênticos já existentes são pulados (contando repetições: se o
+    extrato tem dois cafés iguais no mesmo dia e só um já existe, o outro entra).
+    O ID de cada documento deriva do hash, então reimportar o mesmo arquivo não duplica nada.
+    progress_callback(lidas, None) é chamado a cada lote gravado.
+    Retorna {"imported", "duplicates", "skipped", "errors"}.
+    """
+    from database.data_manager import add_transactions, transaction_index
+
+    existing = Counter(content_hash(t) for t in transaction_index(user_id).all())
+    seen = Counter()
+    result = {"imported": 0, "duplicates": 0, "skipped": 0, "errors": []}
+    batch = []
+    read = 0
+
+    for tx, error in iter_statement(path):
+        read += 1
+        if tx is None:
+            result["skipped"] += 1
+            if len(result["errors"]) < 20:
+                result["errors"].append(error)
+            continue
+
+        digest = content_hash(tx)
+        seen[digest] += 1
+        if existing[digest] > 0:
+            existing[digest] -= 1
+            result["duplicates"] += 1
+            continue
+
+        tx["user_id"] = user_id
+        tx["id"] = hashlib.sha1(f"{user_id}|{digest}|{seen[digest]}".encode("utf-8")).hexdigest()[:20]
+        tx["source"] = "import"
+        batch.append(tx)
+        if len(batch) >= batch_size:
+            add_transactions(batch)
+            result["imported"] += len(batch)
+            batch = []
+            if progress_callback:
+                progress_callback(read, None)
+
+    if batch:
+        add_transactions(batch)
+        result["imported"] += len(batch)
+    if progress_callback:
+        progress_callback(read, read)
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    summary = import_statement(sys.argv[1], sys.argv[2])
+    print(f"✅ {summary['imported']} importadas, {summary['duplicates']} duplicadas, "
+          f"{summary['skipped']} ignoradas.")
+    for err in summary["errors"]:
+        print(f"  - {err}")
@@ -0,0 +1,190 @@
+# logic/transaction.py
+"""
+Registro compacto de transação.
+
+Dentro do app as transações ficam em objetos com __slots__ (sem dict por
+instância): valor em centavos inteiros e tipo, categoria, moeda, recorrência
+e usuário como strings internadas (uma cópia só para milhares de linhas).
+Na fronteira com Firestore/SQLite/CSV elas voltam a ser dicts (to_dict).
+
+Para o código que ainda lê tx["amount"] / tx.get("category"), o objeto se
+comporta como um Mapping somente leitura com as mesmas chaves do dict
+original; laços quentes devem usar os atributos (tx.amount_cents, tx.category).
+"""
+import sys
+from collections.abc import Mapping
+
+from logic.dates import DATE_DAY_FIELD, parse_epoch_day
+
+# Campos com slot próprio, na ordem em que aparecem no dict ("amount" vira amount_cents)
+FIELDS = (
+    "id", "user_id", "date", DATE_DAY_FIELD, "desc", "amount",
+    "type", "category", "currency", "recurrence", "updated_at",
+)
+_KNOWN = frozenset(FIELDS)
+_ATTRS = tuple("amount_cents" if f == "amount" else f for f in FIELDS)
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def to_cents(value) -> int:
+    """Valor em unidades (float, int ou texto numérico) -> centavos inteiros (0 se inválido)."""
+    if type(value) is int:
+        return value * 100
+    try:
+        return round(float(value or 0) * 100)
+    except (ValueError, TypeError):
+        return 0
+
+
+class Transaction(Mapping):
+    __slots__ = _ATTRS + ("extra",)
+
+    def __init__(self, id=None, user_id=None, date=None, date_day=None, desc=None, amount_cents=0,
+                 type=None, category=None, currency=None, recurrence=None, updated_at=None, extra=None):
+        self.id = id
+        self.user_id = _intern(user_id)
+        self.date = date
+        self.date_day = date_day
+        self.desc = desc
+        self.amount_cents = amount_cents
+        self.type = _intern(type)
+        self.category = _intern(category)
+        self.currency = _intern(currency)
+        self.recurrence = _intern(recurrence)
+        self.updated_at = updated_at
+        self.extra = extra or None  # demais campos do documento (raro)
+
+    # ---------- Fronteira dict <-> objeto ----------
+    @classmethod
+    def from_dict(cls, data) -> "Transaction":
+        """Converte um dict (Firestore, cache) em Transaction; objetos já convertidos passam direto."""
+        if isinstance(data, cls):
+            return data
+        get = data.get
+        day = get(DATE_DAY_FIELD)
+        if day is None:
+            day = parse_epoch_day(get("date"))
+        extra = None
+        if len(data) > len(_KNOWN) or not _KNOWN.issuperset(data):
+            extra = {k: v for k, v in data.items() if k not in _KNOWN} or None
+        return cls(
+            get("id"), get("user_id"), get("date"), day, get("desc"), to_cents(get("amount")),
+            get("type"), get("category"), get("currency"), get("recurrence"), get("updated_at"), extra,
+        )
+
+    def to_dict(self) -> dict:
+        data = {}
+        for field, attr in zip(FIELDS, _ATTRS):
+            value = getattr(self, attr)
+            if value is not None:
+                data[field] = value
+        data["amount"] = self.amount_cents / 100
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @property
+    def amount(self) -> float:
+        return self.amount_cents / 100
+
+    # ---------- Interface de Mapping (compatibilidade com tx["..."]) ----------
+    def __getitem__(self, key):
+        if key == "amount":
+            return self.amount_cents / 100
+        if key in _KNOWN:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key == "amount":
+            return self.amount_cents / 100
+        if key in _KNOWN:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __iter__(self):
+        for field, attr in zip(FIELDS, _ATTRS):
+            if getattr(self, attr) is not None:
+                yield field
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __setitem__(self, key, value):
+        """Alteração pontual pela UI (ex.: recorrência no card)."""
+        if key == "amount":
+            self.amount_cents = to_cents(value)
+        elif key in _KNOWN:
+            setattr(self, key, _intern(value))
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __repr__(self):
+        return (f"Transaction(id={self.id!r}, date={self.date!r}, amount={self.amount:.2f}, "
+                f"type={self.type!r}, category={self.category!r}, currency={self.currency!r})")
+
+
+def as_dict(tx) -> dict:
+    """Transaction ou dict -> dict (para gravar em JSON/Firestore)."""
+    if isinstance(tx, Transaction):
+        return tx.to_dict()
+    return tx if isinstance(tx, dict) else dict(tx)
+
+
+# Memória: python -m logic.transaction
+if __name__ == "__main__":
+    import random
+    import time
+    import tracemalloc
+
+    cats = ["Aluguel", "Alimentação", "Transporte", "Contas", "Lazer", "Salário"]
+
+    def _synthetic(n):
+        # strings montadas em tempo de execução, como chegam do JSON/Firestore (sem compartilhamento)
+        return [
+            {
+                "id": f"id{i:08d}",
+                "user_id": "".join(["usuario", "1"]),
+                "date": f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+                "desc": f"Compra {i}",
+                "amount": round(random.uniform(1, 500), 2),
+                "type": "".join(random.choice([["entra", "da"], ["saí", "da"]])),
+                "category": "".join([random.choice(cats), ""]),
+                "currency": "".join(["BR", "L"]),
+                "recurrence": "".join(["Úni", "ca"]),
+                "updated_at": time.time(),
+            }
+            for i in range(n)
+        ]
+
+    n = 100_000
+    tracemalloc.start()
+    data = _synthetic(n)
+    dicts_bytes = tracemalloc.get_traced_memory()[0]
+    records = [Transaction.from_dict(t) for t in data]
+    del data
+    records_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{n} transações: dicts {dicts_bytes / 1e6:.1f} MB | Transaction {records_bytes / 1e6:.1f} MB")
+
+    start = time.perf_counter()
+    total = sum(t.amount_cents for t in records)
+    attr_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    sum(t.to_dict()["amount"] for t in records[:10_000])
+    print(f"soma por atributo: {attr_ms:.1f} ms | to_dict (10k): {(time.perf_counter() - start) * 1000:.1f} ms")
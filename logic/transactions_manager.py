@@ -1,8 +1,12 @@
 # logic/transactions_manager.py
 
-from database.data_manager import load_transactions, add_transaction as save_transaction, delete_transaction
-from datetime import datetime
-import csv
+from database.data_manager import (
+    load_transactions, load_transactions_page, load_local_page,
+    add_transaction as save_transaction, delete_transaction
+)
+from database.csv_export import write_csv
+from database.sqlite_manager import get_watermark
+from logic.dates import parse_epoch_day, transaction_day
 
 # -------------------------------
 # Obter todas as transações
@@ -13,26 +17,70 @@ def get_all_transactions(user_id=None, start_date=None, end_date=None):
     - user_id: retorna só transações do usuário
     - start_date e end_date: objetos datetime.date
     """
-    transactions = load_transactions()  # pega todas do Firebase/SQLite
+    transactions = load_transactions(user_id=user_id)  # consulta já filtrada no Firestore
 
-    # Filtra por usuário
-    if user_id:
-        transactions = [t for t in transactions if t.get("user_id") == user_id]
+    # Limites convertidos uma vez; cada linha compara só inteiros (epoch-day)
+    start_day = parse_epoch_day(start_date)
+    end_day = parse_epoch_day(end_date)
+    if start_day is None and end_day is None:
+        return transactions
 
-    # Função para converter data de string para datetime.date
-    def parse_date(tx):
-        d = tx.get("date", "")
-        try:
-            return datetime.strptime(d, "%Y-%m-%d").date()  # ajuste para o formato que você está salvando
-        except:
-            return None
+    filtered = []
+    for t in transactions:
+        day = transaction_day(t)
+        if day is None:
+            continue
+        if start_day is not None and day < start_day:
+            continue
+        if end_day is not None and day > end_day:
+            continue
+        filtered.append(t)
+    return filtered
 
-    if start_date:
-        transactions = [t for t in transactions if parse_date(t) and parse_date(t) >= start_date]
-    if end_date:
-        transactions = [t for t in transactions if parse_date(t) and parse_date(t) <= end_date]
+# -------------------------------
+# Paginação
+# -------------------------------
+DEFAULT_PAGE_SIZE = 50
+
+def get_transactions_page(user_id, page_size=DEFAULT_PAGE_SIZE, cursor=None,
+                          start_date=None, end_date=None, tx_type=None):
+    """
+    Retorna uma página de transações do usuário, ordenadas por data (mais recentes primeiro).
+    - cursor: valor devolvido pela página anterior (None para a primeira)
+    - start_date e end_date: objetos datetime.date
+    Com o cache local já sincronizado, as páginas saem do índice em memória (mesma fonte
+    do dashboard). No primeiro acesso (cache frio) saem do Firestore por cursor, com as
+    escritas pendentes por cima, sem esperar a sincronização completa.
+    Retorna (transações, próximo_cursor); próximo_cursor None indica fim.
+    """
+    if cursor is None:
+        local = get_watermark(user_id) is not None
+    else:
+        local = isinstance(cursor, tuple)  # (dia, id) do índice; senão, snapshot do Firestore
+    load_page = load_local_page if local else load_transactions_page
+    return load_page(
+        user_id,
+        page_size=page_size,
+        cursor=cursor,
+        start_date=start_date,
+        end_date=end_date,
+        tx_type=tx_type,
+    )
 
-    return transactions
+def iter_transactions(user_id, start_date=None, end_date=None, tx_type=None, page_size=500):
+    """
+    Gera as mesmas transações da tela, página a página (ver get_transactions_page),
+    sem montar a lista inteira; serve de origem para export_transactions_csv.
+    """
+    cursor = None
+    while True:
+        page, cursor = get_transactions_page(
+            user_id, page_size=page_size, cursor=cursor,
+            start_date=start_date, end_date=end_date, tx_type=tx_type,
+        )
+        yield from page
+        if cursor is None:
+            return
 
 # -------------------------------
 # Adicionar transação
@@ -65,17 +113,17 @@ def restore_deleted_transaction(transaction):
 # -------------------------------
 # Exportar CSV
 # -------------------------------
-def export_transactions_csv(transactions, path):
-    if not transactions:
-        print("Nenhuma transação para exportar.")
-        return False
+def export_transactions_csv(transactions, path, progress_callback=None):
+    """
+    Exporta qualquer iterável de transações (lista ou gerador) em streaming.
+    Caminhos terminados em ".gz" geram CSV compactado.
+    """
     try:
-        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=transactions[0].keys())
-            writer.writeheader()
-            for t in transactions:
-                writer.writerow(t)
-        return True
+        count = write_csv(transactions, path, progress_callback=progress_callback)
     except Exception as e:
         print(f"[Erro CSV] {e}")
         return False
+    if not count:
+        print("Nenhuma transação para exportar.")
+        return False
+    return True
@@ -1,52 +1,33 @@
 # logic/usr_config.py
-import os
 import logging
+import threading
 
-try:
-    import firebase_admin
-    from firebase_admin import credentials, firestore
-except Exception as e:
-    raise RuntimeError("Instale firebase-admin (pip install firebase-admin) e configure as credenciais.") from e
+from database.firestore_client import get_db
 
 _log = logging.getLogger(__name__)
 _log.addHandler(logging.NullHandler())
 
-# Inicializa Firebase (uma vez)
-def _init_firebase():
-    try:
-        if firebase_admin._apps:
-            _log.debug("Firebase já inicializado (apps existentes).")
-            return
-    except Exception:
-        # em algumas versões _apps pode não existir; apenas continue
-        pass
-
-    cred_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS") or os.path.join("config", "firebase_key.json")
-    try:
-        if os.path.exists(cred_path):
-            cred = credentials.Certificate(cred_path)
-            firebase_admin.initialize_app(cred)
-            _log.debug("Firebase inicializado com credenciais em %s", cred_path)
-        else:
-            # tenta Default Application Credentials
-            firebase_admin.initialize_app()
-            _log.debug("Firebase inicializado com Application Default Credentials")
-    except Exception:
-        _log.exception("Não foi possível inicializar o Firebase com %s.", cred_path)
-        raise
-
-_init_firebase()
-_db = firestore.client()
-
 
 class UserConfigManager:
     """Gerencia leitura/escrita/escuta de configs do usuário."""
 
+    # Janela (segundos) em que mudanças seguidas são agrupadas num único envio
+    WRITE_DELAY = 0.5
+    # Espera máxima (segundos) entre novas tentativas após falhas seguidas de envio
+    RETRY_DELAY_MAX = 60.0
+
     def __init__(self, user_id: str):
         if not user_id:
             raise ValueError("user_id não pode ser vazio")
         self.user_id = str(user_id)
-        self.doc_ref = _db.collection("usr_config").document(self.user_id)
+        self.doc_ref = get_db().collection("usr_config").document(self.user_id)
+        self._lock = threading.RLock()
+        self._pending = {}   # alterado localmente, ainda não enviado
+        self._inflight = {}  # enviado, aguardando confirmação
+        self._timer = None
+        self._failures = 0  # envios em segundo plano que falharam seguidos
+        self._subscribers = []
+        self._registration = None
         self.config = {}
         # carregar a config apenas quando instancia (com logs)
         self.config = self.load_config()
@@ -101,20 +82,90 @@ class UserConfigManager:
             raise RuntimeError("Não foi possível criar nem ler a config do usuário.")
 
     def update_config(self, new_config: dict):
-        """Atualiza config local e no Firebase (merge=True)."""
+        """Atualiza config local e envia ao Firebase só os campos alterados (merge=True), na hora."""
         if not isinstance(new_config, dict):
             raise ValueError("new_config deve ser um dict")
         _log.debug("Atualizando config localmente para %s: %s", self.user_id, new_config)
-        self.config.update(new_config)
+        for key, value in new_config.items():
+            self._stage(key, value)
+        self.flush()
+
+    # ---------- Escritas agrupadas ----------
+    def _stage(self, key: str, value) -> bool:
+        """Marca o campo para envio; retorna False se o valor não mudou."""
+        with self._lock:
+            if key in self.config and self.config[key] == value and key not in self._pending:
+                return False
+            self.config[key] = value
+            self._pending[key] = value
+            return True
+
+    def _schedule_flush(self, delay: float = None):
+        with self._lock:
+            if self._timer is not None or not self._pending:
+                return
+            # A janela começa na primeira mudança; as seguintes entram no mesmo envio
+            self._timer = threading.Timer(self.WRITE_DELAY if delay is None else delay, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Envia agora os campos pendentes (um único set com merge)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            changes, self._pending = self._pending, {}
+            if not changes:
+                return
+            self._inflight.update(changes)
         try:
-            self.doc_ref.set(self.config, merge=True)
-            _log.debug("Config atualizada no Firestore para %s", self.user_id)
+            self.doc_ref.set(changes, merge=True)
+            self._failures = 0
+            _log.debug("Config atualizada no Firestore para %s: %s", self.user_id, changes)
         except Exception:
             _log.exception("Erro ao atualizar config no Firestore para %s", self.user_id)
+            with self._lock:
+                # devolve à fila o que não foi sobrescrito nesse meio-tempo
+                for key, value in changes.items():
+                    self._pending.setdefault(key, value)
             raise
+        finally:
+            with self._lock:
+                for key, value in changes.items():
+                    if self._inflight.get(key) == value:
+                        del self._inflight[key]
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception as e:
+            # os campos já voltaram para _pending; tenta de novo com espera crescente
+            with self._lock:
+                self._failures += 1
+                delay = min(self.WRITE_DELAY * 2 ** self._failures, self.RETRY_DELAY_MAX)
+            _log.warning("Envio da config de %s falhou (%s); nova tentativa em %.1fs", self.user_id, e, delay)
+            self._schedule_flush(delay)
+
+    def _merge_remote(self, data: dict) -> bool:
+        """
+        Aplica um snapshot remoto preservando o que ainda não foi confirmado localmente.
+        Retorna False se nada mudou (ex.: eco das próprias escritas).
+        """
+        with self._lock:
+            merged = dict(data or {})
+            merged.update(self._inflight)
+            merged.update(self._pending)
+            if merged == self.config:
+                return False
+            self.config = merged
+            return True
 
     def listen_config(self, callback):
-        """Cria listener em tempo real. Callback recebe (config_dict)."""
+        """
+        Cria listener em tempo real. Callback recebe (config_dict).
+        Ecos das próprias escritas (snapshot igual à config local) não chamam a callback.
+        """
         if not callable(callback):
             raise ValueError("callback deve ser callable")
 
@@ -130,9 +181,10 @@ class UserConfigManager:
                     return
                 data = snap.to_dict()
                 _log.debug("Snapshot recebido para %s: %s", self.user_id, data)
-                # atualiza cache local
-                self.config = data or {}
-                callback(self.config)
+                if not self._merge_remote(data):
+                    _log.debug("Snapshot sem mudanças (eco) para %s", self.user_id)
+                    return
+                callback(dict(self.config))
             except Exception:
                 _log.exception("Erro no snapshot callback para %s", self.user_id)
 
@@ -140,13 +192,58 @@ class UserConfigManager:
         _log.debug("Listener registrado para %s", self.user_id)
         return registration
 
+    # ---------- Assinantes (um único listener para todos) ----------
+    def subscribe(self, callback):
+        """
+        Registra callback(config_dict) para mudanças remotas; o listener do
+        Firestore é criado na primeira assinatura e compartilhado.
+        Retorna uma função que cancela a assinatura.
+        """
+        if not callable(callback):
+            raise ValueError("callback deve ser callable")
+        with self._lock:
+            self._subscribers.append(callback)
+            if self._registration is None:
+                self._registration = self.listen_config(self._dispatch)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _dispatch(self, config: dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(dict(config))
+            except Exception:
+                _log.exception("Erro em assinante da config de %s", self.user_id)
+
+    def close(self):
+        """Envia o que estiver pendente e encerra o listener."""
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                registration, self._registration = self._registration, None
+                self._subscribers.clear()
+            if registration is not None:
+                try:
+                    registration.unsubscribe()
+                except Exception:
+                    _log.exception("Erro ao encerrar listener da config de %s", self.user_id)
+
     # Métodos de conveniência
     def get(self, key: str, default=None):
         return self.config.get(key, default)
 
     def set(self, key: str, value):
-        self.config[key] = value
-        self.update_config({key: value})
+        """Altera um campo; mudanças próximas (WRITE_DELAY) saem juntas num único envio."""
+        if self._stage(key, value):
+            self._schedule_flush()
 
     @classmethod
     def set_user_config(cls, user_id: str, new_config: dict):
@@ -155,10 +252,39 @@ class UserConfigManager:
             raise ValueError("user_id não pode ser vazio")
         if not isinstance(new_config, dict):
             raise ValueError("new_config deve ser dict")
-        doc_ref = _db.collection("usr_config").document(str(user_id))
+        doc_ref = get_db().collection("usr_config").document(str(user_id))
         try:
             doc_ref.set(new_config, merge=True)
             _log.debug("set_user_config: atualizado user_id=%s com %s", user_id, new_config)
         except Exception:
             _log.exception("Erro em set_user_config para %s", user_id)
             raise
+
+
+# ========================
+# Config da sessão
+# ========================
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session_config(user_id: str) -> UserConfigManager:
+    """
+    Config compartilhada da sessão: uma leitura inicial e um único listener
+    para todas as telas do usuário.
+    """
+    user_id = str(user_id)
+    with _sessions_lock:
+        manager = _sessions.get(user_id)
+        if manager is None:
+            manager = UserConfigManager(user_id)
+            _sessions[user_id] = manager
+        return manager
+
+
+def close_session_config(user_id: str):
+    """Grava pendências, encerra o listener e esquece a config da sessão (logout)."""
+    with _sessions_lock:
+        manager = _sessions.pop(str(user_id), None)
+    if manager is not None:
+        manager.close()
@@ -2,11 +2,12 @@ import sys
 from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import QApplication, QMessageBox
 from ui.login_screen import LoginScreen
-from ui.dashboard import DashboardWindow
-from ui.register_window import RegisterWindow
 import config
 from logic.theme_manager import load_theme_qss
 
+# Dashboard, registro e Firebase são importados só quando usados:
+# a tela de login aparece carregando apenas o PyQt6.
+
 
 class AppController:
     def __init__(self, app: QApplication):
@@ -46,16 +47,28 @@ class AppController:
 
     def show_dashboard(self, username: str):
         """Fecha o login e abre o painel principal."""
+        from ui.dashboard import DashboardWindow
+        from logic.firebase import start_outbox_flusher
+
+        start_outbox_flusher()  # envia em segundo plano as escritas pendentes
         self.login_window.close()
         self.dashboard_window = DashboardWindow(username)
         self.dashboard_window.show()
 
     def show_register(self):
         """Abre a janela de registro."""
+        from ui.register_window import RegisterWindow
+
         self.register_window = RegisterWindow()
         self.register_window.user_registered.connect(self.handle_new_user)
         self.register_window.show()
 
+    def shutdown(self):
+        """Libera os recursos em segundo plano antes de o app fechar."""
+        from logic.reports import shutdown_renderer
+
+        shutdown_renderer()  # processo de renderização dos relatórios + cache de PNGs
+
     def handle_new_user(self, username: str):
         """Executado quando um novo usuário é criado."""
         print(f"Novo usuário registrado: {username}")
@@ -68,6 +81,10 @@ class AppController:
 
 
 if __name__ == "__main__":
+    import multiprocessing
+
+    multiprocessing.freeze_support()  # processo de renderização dos relatórios no executável (PyInstaller)
     app = QApplication(sys.argv)
     controller = AppController(app)
+    app.aboutToQuit.connect(controller.shutdown)
     sys.exit(app.exec())
@@ -0,0 +1,32 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def local_db(tmp_path, monkeypatch):
+    """SQLite temporário no lugar de database/db.sqlite (e índices em memória zerados)."""
+    from database import sqlite_manager, transaction_index
+
+    monkeypatch.setattr(sqlite_manager, "DB_PATH", tmp_path / "db.sqlite")
+    monkeypatch.setattr(sqlite_manager, "_initialized", False)
+    monkeypatch.setattr(transaction_index, "_indexes", {})
+    return tmp_path / "db.sqlite"
+
+
+@pytest.fixture
+def fake_db(local_db):
+    """Firestore em memória (firestore_client.set_backend) + SQLite temporário."""
+    from database import firestore_client
+    from fake_firestore import FakeFirestore
+
+    db = FakeFirestore()
+    firestore_client.set_backend(db)
+    yield db
+    firestore_client.set_backend(None)
@@ -0,0 +1,215 @@
+# tests/fake_firestore.py
+"""
+Firestore em memória para os testes (use com database.firestore_client.set_backend).
+
+Cobre só o que o app usa: collection/document, set (com merge), update,
+delete, get, where(filter=FieldFilter), order_by, limit, start_after,
+stream, batch e on_snapshot (sem disparo). Cada documento gravado conta
+em `writes`; SERVER_TIMESTAMP vira a hora atual. `fail_commits` e
+`rejected_ids` simulam falhas de rede e recusas das regras.
+"""
+import itertools
+from datetime import datetime, timezone
+
+from google.api_core.exceptions import PermissionDenied
+from google.cloud.firestore_v1 import SERVER_TIMESTAMP
+from google.cloud.firestore_v1.field_path import FieldPath
+
+_ids = itertools.count(1)
+
+_OPS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def _resolve(data: dict) -> dict:
+    now = datetime.now(timezone.utc)
+    return {k: (now if v is SERVER_TIMESTAMP else v) for k, v in data.items()}
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return self._data.get(field)
+
+
+class FakeDocument:
+    def __init__(self, store, doc_id):
+        self._store = store
+        self.id = doc_id
+
+    def get(self):
+        self._store.reads += 1
+        return FakeSnapshot(self.id, self._store.docs.get(self.id))
+
+    def set(self, data, merge=False):
+        self._store.writes += 1
+        data = _resolve(data)
+        if merge and self.id in self._store.docs:
+            self._store.docs[self.id].update(data)
+        else:
+            self._store.docs[self.id] = dict(data)
+
+    def create(self, data):
+        if self.id in self._store.docs:
+            raise ValueError("documento já existe")
+        self.set(data)
+
+    def update(self, data):
+        if self.id not in self._store.docs:
+            raise KeyError(self.id)
+        self.set(data, merge=True)
+
+    def delete(self):
+        self._store.writes += 1
+        self._store.docs.pop(self.id, None)
+
+    def on_snapshot(self, callback):
+        return FakeWatch()
+
+
+class FakeWatch:
+    def unsubscribe(self):
+        pass
+
+
+class FakeQuery:
+    def __init__(self, store, filters=(), order=None, limit=None, after=None):
+        self._store = store
+        self._filters = list(filters)
+        self._order = order
+        self._limit = limit
+        self._after = after
+
+    def _copy(self, **changes):
+        args = {"filters": self._filters, "order": self._order, "limit": self._limit, "after": self._after}
+        args.update(changes)
+        return FakeQuery(self._store, **args)
+
+    def where(self, filter=None):
+        return self._copy(filters=self._filters + [(filter.field_path, filter.op_string, filter.value)])
+
+    def order_by(self, field, direction="ASCENDING"):
+        if isinstance(field, FieldPath) or field == "__name__":
+            field = "__name__"
+        return self._copy(order=(field, direction == "DESCENDING"))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, snapshot):
+        return self._copy(after=snapshot)
+
+    def _value(self, doc_id, data, field):
+        return doc_id if field == "__name__" else data.get(field)
+
+    def stream(self):
+        rows = []
+        for doc_id, data in self._store.docs.items():
+            ok = True
+            for field, op, value in self._filters:
+                current = data.get(field)
+                if current is None or not _OPS[op](current, value):
+                    ok = False
+                    break
+            if ok:
+                rows.append((doc_id, data))
+
+        if self._order:
+            field, descending = self._order
+            # como no Firestore, order_by deixa de fora documentos sem o campo
+            rows = [r for r in rows if self._value(*r, field) is not None]
+            rows.sort(key=lambda r: self._value(*r, field), reverse=descending)
+            if self._after is not None:
+                ids = [doc_id for doc_id, _ in rows]
+                if self._after.id in ids:
+                    rows = rows[ids.index(self._after.id) + 1:]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        self._store.reads += len(rows)
+        return iter([FakeSnapshot(doc_id, dict(data)) for doc_id, data in rows])
+
+    def get(self):
+        return list(self.stream())
+
+    def on_snapshot(self, callback):
+        return FakeWatch()
+
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id=None):
+        return FakeDocument(self._store, str(doc_id) if doc_id else f"auto{next(_ids):06d}")
+
+
+class FakeBatch:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def set(self, doc_ref, data, merge=False):
+        self._ops.append((doc_ref.id, lambda: doc_ref.set(data, merge=merge)))
+
+    def update(self, doc_ref, data):
+        self._ops.append((doc_ref.id, lambda: doc_ref.update(data)))
+
+    def delete(self, doc_ref):
+        self._ops.append((doc_ref.id, doc_ref.delete))
+
+    def commit(self):
+        self._client.commits += 1
+        self._client.batch_sizes.append(len(self._ops))
+        if self._client.fail_commits:
+            self._client.fail_commits -= 1
+            raise self._client.fail_error
+        rejected = self._client.rejected_ids.intersection(doc_id for doc_id, _ in self._ops)
+        if rejected:
+            raise PermissionDenied(f"regras recusaram {sorted(rejected)}")
+        for _doc_id, op in self._ops:
+            op()
+
+
+class _Store:
+    def __init__(self):
+        self.docs = {}
+        self.reads = 0
+        self.writes = 0
+
+
+class FakeFirestore:
+    def __init__(self):
+        self._collections = {}
+        self.commits = 0
+        self.batch_sizes = []  # operações em cada commit (inclusive os que falharam)
+        self.fail_commits = 0  # quantos commits seguidos devem falhar
+        self.fail_error = RuntimeError("falha simulada")
+        self.rejected_ids = set()  # documentos recusados sempre (como uma regra de segurança)
+
+    def _store(self, name) -> _Store:
+        return self._collections.setdefault(name, _Store())
+
+    def collection(self, name):
+        return FakeCollection(self._store(name))
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def docs(self, name) -> dict:
+        return self._store(name).docs
+
+    def writes(self, name) -> int:
+        return self._store(name).writes
+
+    def reads(self, name) -> int:
+        return self._store(name).reads
@@ -0,0 +1,42 @@
+# tests/test_add_transaction.py
+"""add_transaction grava local e gera exatamente uma escrita no Firestore."""
+from database.data_manager import add_transaction, add_transactions, load_cached_transactions
+from database.sqlite_manager import outbox_peek
+from logic.firebase import flush_outbox
+
+
+def test_add_transaction_is_one_write(fake_db):
+    doc_id = add_transaction({"user_id": "u1", "desc": "Café", "amount": 7.5, "date": "2024-03-01"})
+
+    # nada vai à rede antes do flush: o documento fica no cache e na fila
+    assert fake_db.writes("transactions") == 0
+    assert [t["id"] for t in load_cached_transactions("u1", refresh=False)] == [doc_id]
+    assert len(outbox_peek()) == 1
+
+    assert flush_outbox() == 1
+    assert fake_db.writes("transactions") == 1
+    assert fake_db.commits == 1
+    assert outbox_peek() == []
+
+    stored = fake_db.docs("transactions")[doc_id]
+    assert stored["amount"] == 7.5
+    assert stored["date_day"] is not None
+    assert stored["updated_at"] is not None
+
+
+def test_each_add_is_one_write(fake_db):
+    for i in range(5):
+        add_transaction({"user_id": "u1", "amount": i + 1, "date": f"2024-03-0{i + 1}"})
+
+    assert flush_outbox() == 5
+    assert fake_db.writes("transactions") == 5
+    assert fake_db.commits == 1  # as 5 escritas saem num único WriteBatch
+
+
+def test_batch_add_is_one_write_per_transaction(fake_db):
+    rows = [{"id": f"imp{i}", "user_id": "u1", "amount": 10, "date": "2024-03-01"} for i in range(3)]
+    add_transactions(rows)
+
+    assert flush_outbox() == 3
+    assert fake_db.writes("transactions") == 3
+    assert sorted(fake_db.docs("transactions")) == ["imp0", "imp1", "imp2"]
@@ -0,0 +1,34 @@
+# tests/test_aggregation.py
+"""summarize / apply_delta mantêm as regras antigas de relatórios e do saldo do dashboard."""
+from logic.aggregation import apply_delta, summarize
+from logic.reports import calculate_totals_by_category, generate_monthly_report
+
+ROWS = [
+    {"amount": 100, "type": "entrada", "category": "Salário"},
+    {"amount": 30, "type": "saída", "category": "Lazer"},
+    {"amount": 20, "type": "transferência"},  # tipo desconhecido, sem categoria
+]
+
+
+def test_unknown_types_are_dropped_by_default():
+    summary = summarize(ROWS)
+    assert summary["balance"] == 70
+    assert summary["by_category"]["Outros"] == 20
+
+
+def test_dashboard_balance_subtracts_every_non_income_type():
+    summary = summarize(ROWS, unknown_as_expense=True)
+    assert summary["expense"] == 50
+    assert summary["balance"] == 50
+
+    incremental = summarize([], unknown_as_expense=True)
+    for tx in ROWS:
+        apply_delta(incremental, None, tx, unknown_as_expense=True)
+    assert incremental["balance"] == summary["balance"]
+    assert incremental["expense_by_category"] == summary["expense_by_category"]
+
+
+def test_reports_keep_their_defaults():
+    rows = [{"value": 5, "type": "income"}, {"value": 2, "type": "expense", "category": "Food"}]
+    assert calculate_totals_by_category(rows) == {"Others": 5, "Food": 2}
+    assert generate_monthly_report(rows) == {"total_income": 5, "total_expenses": 2, "balance": 3}
@@ -0,0 +1,64 @@
+# tests/test_ai_context.py
+"""O prompt do assistente fica dentro do orçamento de tokens, qualquer que seja o histórico."""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from logic.ai_assistant import SYSTEM_PROMPT, AIAssistant
+from logic.ai_context import estimate_tokens
+
+QUESTION = "Como estão meus gastos?"
+
+
+class StubClient:
+    """Cliente falso: guarda as mensagens enviadas e devolve uma resposta fixa."""
+
+    def __init__(self):
+        self.sent = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.sent.append(kwargs["messages"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+
+def _synthetic(n, seed=42):
+    rng = random.Random(seed)
+    cats = ["Aluguel", "Alimentação", "Transporte", "Contas", "Lazer", "Salário"]
+    return [
+        {
+            "id": str(i),
+            "amount": round(rng.uniform(1, 500), 2),
+            "type": rng.choice(["entrada", "saída"]),
+            "category": rng.choice(cats),
+            "currency": "BRL",
+            "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "desc": f"Compra {i}",
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("budget", [500, config.AI_CONTEXT_TOKEN_BUDGET, 4000])
+def test_prompt_for_10k_transactions_stays_within_budget(budget):
+    data = _synthetic(10_000)
+    client = StubClient()
+    assistant = AIAssistant(client=client, context_tokens=budget, cache_enabled=False)
+
+    assert assistant.ask(QUESTION, user_id="u1", transactions=data) == "ok"
+    assert len(client.sent) == 1
+    prompt = "\n".join(m["content"] for m in client.sent[0])
+
+    # o que não é contexto: prompt de sistema, pergunta e moldura
+    fixed = SYSTEM_PROMPT + "\n" + AIAssistant._format_prompt(QUESTION, "-")
+    assert estimate_tokens(prompt) <= budget + estimate_tokens(fixed)
+    assert len(prompt) <= 4 * budget + len(fixed)
+    assert "Resumo (BRL): 10000 transações" in prompt
+    # o histórico cru é ordens de grandeza maior que o orçamento
+    assert estimate_tokens(repr(data)) > 10 * budget
+
+
+def test_default_budget_comes_from_config():
+    assert AIAssistant(client=StubClient()).context_tokens == config.AI_CONTEXT_TOKEN_BUDGET
@@ -0,0 +1,70 @@
+# tests/test_bulk_write.py
+"""bulk_write: blocos de até 500, novas tentativas só para falhas transitórias, relatório de falhas."""
+from google.api_core.exceptions import InvalidArgument, ServiceUnavailable
+
+from logic.firebase import MAX_BATCH_SIZE, bulk_write
+
+
+def _ops(n):
+    return [("set", f"t{i}", {"user_id": "u1", "amount": i}) for i in range(n)]
+
+
+def test_chunks_never_exceed_the_firestore_limit(fake_db):
+    result = bulk_write(_ops(1201), chunk_size=1000, base_delay=0)
+
+    assert result == {"written": 1201, "failed": 0, "errors": [], "failed_ops": []}
+    assert sorted(fake_db.batch_sizes) == [201, MAX_BATCH_SIZE, MAX_BATCH_SIZE]
+    assert len(fake_db.docs("transactions")) == 1201
+
+
+def test_transient_failure_is_retried_until_success(fake_db):
+    fake_db.fail_commits = 2
+    fake_db.fail_error = ServiceUnavailable("fora do ar")
+
+    result = bulk_write(_ops(10), max_workers=1, max_retries=3, base_delay=0)
+
+    assert result["written"] == 10 and result["failed"] == 0
+    assert fake_db.commits == 3
+
+
+def test_permanent_failure_is_not_retried_and_is_reported(fake_db):
+    fake_db.rejected_ids = {"t3"}
+
+    result = bulk_write(_ops(6), chunk_size=2, max_workers=1, max_retries=3, base_delay=10)
+
+    assert result["written"] == 4 and result["failed"] == 2
+    assert sorted(doc_id for _op, doc_id, _data in result["failed_ops"]) == ["t2", "t3"]
+    assert len(result["errors"]) == 1 and "t3" in result["errors"][0]
+    assert fake_db.commits == 3  # sem repetir o bloco recusado (base_delay=10 travaria o teste)
+    assert "t2" not in fake_db.docs("transactions")  # o bloco é atômico
+
+
+def test_invalid_argument_fails_fast(fake_db):
+    fake_db.fail_commits = 1
+    fake_db.fail_error = InvalidArgument("documento inválido")
+
+    result = bulk_write(_ops(3), max_retries=3, base_delay=10)
+
+    assert result["failed"] == 3 and fake_db.commits == 1
+
+
+def test_retries_give_up_after_max_retries(fake_db):
+    fake_db.fail_commits = 5
+    fake_db.fail_error = ServiceUnavailable("fora do ar")
+
+    result = bulk_write(_ops(3), max_workers=1, max_retries=2, base_delay=0)
+
+    assert result["failed"] == 3 and fake_db.commits == 3
+
+
+def test_progress_callback_reports_each_chunk(fake_db):
+    calls = []
+    fake_db.rejected_ids = {"t0"}
+
+    bulk_write(_ops(25), chunk_size=10, max_workers=2, base_delay=0,
+               progress_callback=lambda done, total: calls.append((done, total)))
+
+    assert len(calls) == 3
+    assert [done for done, _ in calls] == sorted(done for done, _ in calls)
+    assert calls[-1] == (25, 25)
+    assert {total for _, total in calls} == {25}
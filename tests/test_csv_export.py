@@ -0,0 +1,58 @@
+# tests/test_csv_export.py
+"""write_csv: cabeçalho com a união das colunas, saída gzip e progresso."""
+import csv
+import gzip
+
+from database.csv_export import write_csv
+from logic.transaction import Transaction
+
+
+def _rows():
+    yield {"id": "a", "amount": 1.5, "date": "2024-01-01"}
+    yield Transaction.from_dict({"id": "b", "amount": 2, "desc": "Café", "date": "2024-01-02"})
+    yield {"id": "c", "amount": 3, "nota": "extra", "date": "2024-01-03"}
+
+
+def _read(path, opener=open):
+    with opener(path, "rt", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_header_is_the_union_of_all_keys(tmp_path):
+    path = tmp_path / "out.csv"
+    assert write_csv(_rows(), str(path)) == 3
+
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+    # colunas conhecidas na ordem fixa; extras no fim, na ordem em que aparecem
+    assert header == ["id", "date", "date_day", "desc", "amount", "nota"]
+    rows = _read(path)
+    assert [r["id"] for r in rows] == ["a", "b", "c"]
+    assert rows[0]["desc"] == "" and rows[1]["desc"] == "Café" and rows[2]["nota"] == "extra"
+
+
+def test_gzip_output(tmp_path):
+    path = tmp_path / "out.csv.gz"
+    assert write_csv(_rows(), str(path)) == 3
+    with open(path, "rb") as f:
+        assert f.read(2) == b"\x1f\x8b"
+    assert [r["amount"] for r in _read(path, gzip.open)] == ["1.5", "2.0", "3"]
+
+
+def test_progress_callback_and_streaming_source(tmp_path):
+    calls = []
+    rows = ({"id": str(i), "amount": i} for i in range(25))  # gerador: lido uma única vez
+    assert write_csv(rows, str(tmp_path / "out.csv"), progress_callback=lambda done, total: calls.append((done, total)),
+                     chunk_size=10) == 25
+
+    reading = [c for c in calls if c[1] is None]
+    writing = [c for c in calls if c[1] is not None]
+    assert reading == [(10, None), (20, None)]
+    assert writing[-1] == (25, 25)
+    assert [done for done, _ in writing] == sorted(done for done, _ in writing)
+
+
+def test_nothing_is_written_without_rows(tmp_path):
+    path = tmp_path / "empty.csv"
+    assert write_csv(iter(()), str(path)) == 0
+    assert not path.exists()
@@ -0,0 +1,72 @@
+# tests/test_local_transactions.py
+"""Páginas da tela de transações: cursor sobre o cache local, ou o Firestore no primeiro acesso."""
+from database.data_manager import add_transaction, delete_transaction, sync_transactions_cache
+from logic.transactions_manager import get_transactions_page, iter_transactions
+
+
+def _seed(db):
+    col = db.collection("transactions")
+    col.document("old").set({"user_id": "u1", "amount": 5, "type": "saída", "date": "2023-12-31"})  # sem date_day
+    col.document("kept").set({"user_id": "u1", "amount": 8, "type": "entrada", "date": "2024-01-02", "date_day": 19724})
+    col.document("gone").set({"user_id": "u1", "amount": 9, "type": "saída", "date": "2024-01-03", "date_day": 19725})
+    col.document("other").set({"user_id": "u2", "amount": 1, "type": "saída", "date": "2024-01-03", "date_day": 19725})
+
+
+def _all_pages(user_id, page_size=2, **filters):
+    ids, cursor = [], None
+    while True:
+        page, cursor = get_transactions_page(user_id, page_size=page_size, cursor=cursor, **filters)
+        ids += [t["id"] for t in page]
+        if cursor is None:
+            return ids
+
+
+def test_cold_cache_pages_firestore_with_pending_writes_on_top(fake_db):
+    _seed(fake_db)
+    # ainda na fila de saída (sem flush_outbox): o Firestore não sabe de nada
+    new_id = add_transaction({"user_id": "u1", "amount": 3, "type": "saída", "date": "2024-01-04"})
+    delete_transaction("gone")
+
+    page, cursor = get_transactions_page("u1", page_size=1)
+    assert [t["id"] for t in page] == [new_id]  # a pendente entra no topo; "gone" some
+    assert not isinstance(cursor, tuple)  # cursor do Firestore
+    assert _all_pages("u1") == [new_id, "kept"]
+
+
+def test_synced_cache_pages_the_local_index(fake_db):
+    _seed(fake_db)
+    sync_transactions_cache("u1")
+    new_id = add_transaction({"user_id": "u1", "amount": 3, "type": "saída", "date": "2024-01-04"})
+    delete_transaction("gone")
+    reads = fake_db.reads("transactions")
+
+    page, cursor = get_transactions_page("u1", page_size=2)
+    assert [t["id"] for t in page] == [new_id, "kept"]
+    assert cursor == (19724, "kept")
+    assert _all_pages("u1") == [new_id, "kept", "old"]  # sem date_day no fim
+    assert _all_pages("u1", tx_type="saída") == [new_id, "old"]
+    assert _all_pages("u1", start_date="2024-01-01") == [new_id, "kept"]
+    assert fake_db.reads("transactions") == reads  # nada lido do Firestore
+
+
+def test_cursor_survives_changes_between_pages(fake_db):
+    _seed(fake_db)
+    sync_transactions_cache("u1")
+
+    page, cursor = get_transactions_page("u1", page_size=1)
+    assert [t["id"] for t in page] == ["gone"]
+    add_transaction({"user_id": "u1", "amount": 1, "date": "2024-02-01"})  # mais nova que o cursor
+    delete_transaction("kept")  # próxima linha some antes de ser lida
+
+    page, cursor = get_transactions_page("u1", page_size=5, cursor=cursor)
+    assert [t["id"] for t in page] == ["old"]
+    assert cursor is None
+
+
+def test_export_iterator_follows_the_pages(fake_db):
+    _seed(fake_db)
+    sync_transactions_cache("u1")
+    rows = iter_transactions("u1", page_size=1)
+    assert next(rows)["id"] == "gone"  # gerador: só a primeira página foi lida
+    assert [t["id"] for t in rows] == ["kept", "old"]
+    assert [t["id"] for t in iter_transactions("u1", tx_type="entrada")] == ["kept"]
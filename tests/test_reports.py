@@ -0,0 +1,25 @@
+# tests/test_reports.py
+"""Relatórios: o processo de renderização e o cache de PNGs são liberados no encerramento."""
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from logic import reports
+
+
+def test_shutdown_renderer_drops_pool_and_png_cache():
+    transactions = [
+        {"type": "saída", "category": "Mercado", "value": 120.0},
+        {"type": "saída", "category": "Lazer", "value": 30.0},
+    ]
+    try:
+        png = reports.render_pie_chart_async(transactions).result(timeout=120)
+        assert png.getvalue().startswith(b"\x89PNG")
+        assert reports._executor is not None
+        assert reports._png_cache._size > 0
+    finally:
+        reports.shutdown_renderer()
+
+    assert reports._executor is None
+    assert reports._png_cache._size == 0
+    assert reports._png_cache.get(reports._cache_key(reports.expense_totals(transactions), reports.PIE_COLORS)) is None
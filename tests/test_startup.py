@@ -0,0 +1,26 @@
+# tests/test_startup.py
+"""Inicialização: a tela de login abre sem carregar matplotlib, Firebase etc. (ver bench_startup.py)."""
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+import bench_startup
+
+
+def test_login_window_opens_without_heavy_modules():
+    proc, _elapsed_ms = bench_startup.measure_startup()
+    assert proc.returncode == 0, proc.stderr[-2000:]
+
+    imports = bench_startup.parse_importtime(proc.stderr)
+    assert any(name == "main" for name, _ in imports)
+    assert bench_startup.heavy_imports(imports) == []
+
+
+def test_lazy_names_still_resolve():
+    import logic
+    import ui.widgets
+
+    assert logic.add_transaction.__module__ == "logic.transactions"
+    assert ui.widgets.ChartWidget.__name__ == "ChartWidget"
+    with pytest.raises(AttributeError):
+        ui.widgets.NotAWidget
@@ -0,0 +1,39 @@
+# tests/test_transaction_index.py
+"""TransactionIndex: lotes grandes com ids repetidos e páginas por cursor."""
+from database.transaction_index import TransactionIndex
+
+
+def _tx(doc_id, day, amount=1.0, tx_type="saída"):
+    return {"id": doc_id, "date_day": day, "amount": amount, "type": tx_type}
+
+
+def test_batch_with_repeated_id_keeps_last_version_once():
+    index = TransactionIndex([_tx("a", 5)])
+    batch = [_tx(f"n{i}", i % 10) for i in range(TransactionIndex.MERGE_THRESHOLD)]
+    batch += [_tx("a", 7, amount=2.0), _tx("dup", 3), _tx("dup", 8, amount=9.0)]
+    index.upsert_many(batch)
+
+    ids = [t.id for t in index.all()]
+    assert len(ids) == len(set(ids)) == len(index) == TransactionIndex.MERGE_THRESHOLD + 2
+    assert [t.amount for t in index.query(start_date=8, end_date=8) if t.id == "dup"] == [9.0]
+    assert [t.id for t in index.query(start_date=3, end_date=3)].count("dup") == 0
+    assert [t.amount for t in index.all() if t.id == "a"] == [2.0]
+
+
+def test_small_batch_with_repeated_id():
+    index = TransactionIndex()
+    index.upsert_many([_tx("x", 1), _tx("x", 2)])
+    assert [(t.id, t.date_day) for t in index.all()] == [("x", 2)]
+
+
+def test_pages_cover_every_row_once():
+    index = TransactionIndex([_tx(f"t{i:02d}", i % 4) for i in range(30)] + [{"id": "nodate", "amount": 1}])
+    seen, cursor = [], None
+    while True:
+        page, cursor = index.page(7, cursor)
+        seen += [t.id for t in page]
+        if cursor is None:
+            break
+    assert seen == [t.id for t in index.all()]
+    assert seen[-1] == "nodate"
+    assert len(set(seen)) == 31
@@ -0,0 +1,43 @@
+# tests/test_transaction_table_model.py
+"""TransactionTableModel: remoções mantêm o mapa id -> linha sem reconstruí-lo."""
+import pytest
+
+pytest.importorskip("PyQt6.QtCore")
+
+from ui.widgets.transaction_table_model import TransactionTableModel
+
+
+def _model(n):
+    model = TransactionTableModel([("Valor", "amount")])
+    model.set_transactions([{"id": f"t{i}", "amount": i} for i in range(n)])
+    return model
+
+
+def test_remove_keeps_order_and_row_index():
+    model = _model(6)
+    assert model.row_of("t5") == 5
+    index_map = model._row_of
+
+    assert model.remove_transaction("t2")["amount"] == 2
+    model.remove_row(0)
+
+    assert [tx["id"] for tx in model.transactions] == ["t1", "t3", "t4", "t5"]
+    assert model._row_of is index_map  # atualizado no lugar, não recalculado
+    assert {tx["id"]: model.row_of(tx["id"]) for tx in model.transactions} == {
+        "t1": 0, "t3": 1, "t4": 2, "t5": 3,
+    }
+    assert model.row_of("t2") is None
+    assert model.remove_transaction("t2") is None
+
+
+def test_upsert_after_removals_hits_the_right_row():
+    model = _model(4)
+    model.row_of("t0")
+    model.remove_transaction("t1")
+    model.upsert_transaction({"id": "t3", "amount": 30})
+    model.upsert_transaction({"id": "novo", "amount": 7})
+
+    assert [(tx["id"], tx["amount"]) for tx in model.transactions] == [
+        ("t0", 0), ("t2", 2), ("t3", 30), ("novo", 7),
+    ]
+    assert model.row_of("novo") == 3
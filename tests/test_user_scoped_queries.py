@@ -0,0 +1,91 @@
+# tests/test_user_scoped_queries.py
+"""
+Consultas de transações contra o emulador do Firestore: só os documentos do
+usuário logado são lidos. Roda apenas com o emulador no ar:
+
+    firebase emulators:start --only firestore      (porta 8080, ver firebase.json)
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python -m pytest -q tests/test_user_scoped_queries.py
+"""
+import os
+import urllib.request
+
+import pytest
+
+EMULATOR = os.environ.get("FIRESTORE_EMULATOR_HOST")
+PROJECT = os.environ.get("GCLOUD_PROJECT", "demo-moneyyou")
+
+pytestmark = pytest.mark.skipif(not EMULATOR, reason="FIRESTORE_EMULATOR_HOST não definido")
+
+
+def _clear_emulator():
+    url = f"http://{EMULATOR}/emulator/v1/projects/{PROJECT}/databases/(default)/documents"
+    urllib.request.urlopen(urllib.request.Request(url, method="DELETE")).close()
+
+
+@pytest.fixture
+def emulator_db(local_db):
+    from google.cloud import firestore
+
+    from database import firestore_client
+
+    _clear_emulator()
+    client = firestore.Client(project=PROJECT)
+    firestore_client.set_backend(client)
+    collection = client.collection("transactions")
+    for i in range(6):
+        collection.document(f"alice{i}").set({
+            "user_id": "alice", "amount": 10 + i, "type": "entrada" if i % 2 else "saída",
+            "category": "Lazer", "date": f"2024-01-0{i + 1}", "date_day": 19723 + i,
+        })
+    for i in range(9):
+        collection.document(f"bob{i}").set({
+            "user_id": "bob", "amount": 99, "type": "entrada",
+            "category": "Lazer", "date": f"2024-01-0{i + 1}", "date_day": 19723 + i,
+        })
+    yield client
+    firestore_client.set_backend(None)
+    _clear_emulator()
+
+
+def _ids(transactions):
+    return sorted(t.get("id") or "" for t in transactions)
+
+
+def test_query_reads_only_user_documents(emulator_db):
+    from database.data_manager import query_transactions
+
+    docs = list(query_transactions("alice").stream())
+    assert len(docs) == 6
+    assert {doc.id for doc in docs} == {f"alice{i}" for i in range(6)}
+    assert all(doc.to_dict()["user_id"] == "alice" for doc in docs)
+
+
+def test_filters_are_pushed_down(emulator_db):
+    from database.data_manager import load_transactions
+
+    rows = load_transactions("alice", start_date="2024-01-02", end_date="2024-01-05", tx_type="entrada")
+    assert sorted(t["amount"] for t in rows) == [11, 13]
+    assert all(t["user_id"] == "alice" for t in rows)
+
+
+def test_pages_and_export_iterator_stay_in_user(emulator_db):
+    from database.data_manager import load_transactions_page
+    from logic.transactions_manager import iter_transactions
+
+    page, cursor = load_transactions_page("alice", page_size=4)
+    rest, end = load_transactions_page("alice", page_size=4, cursor=cursor)
+    assert end is None
+    assert len(page) + len(rest) == 6
+    assert all(t["user_id"] == "alice" for t in page + rest)
+
+    exported = list(iter_transactions("alice", page_size=4))
+    assert _ids(exported) == [f"alice{i}" for i in range(6)]
+
+
+def test_sync_caches_only_user_documents(emulator_db):
+    from database.data_manager import sync_transactions_cache
+    from database.sqlite_manager import cache_load_transactions
+
+    assert sync_transactions_cache("alice") == 6
+    assert _ids(cache_load_transactions("alice")) == [f"alice{i}" for i in range(6)]
+    assert cache_load_transactions("bob") == []
@@ -0,0 +1,36 @@
+# tests/test_usr_config.py
+"""Envio agrupado da config: falhas em segundo plano são tentadas de novo."""
+import time
+
+from logic.usr_config import UserConfigManager
+
+
+def _wait(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_failed_background_flush_is_retried(fake_db, monkeypatch):
+    monkeypatch.setattr(UserConfigManager, "WRITE_DELAY", 0.01)
+    manager = UserConfigManager("u1")
+    doc_ref = manager.doc_ref
+    send = doc_ref.set
+    calls = []
+
+    def flaky_set(data, merge=False):
+        calls.append(dict(data))
+        if len(calls) <= 2:
+            raise ConnectionError("sem rede")
+        send(data, merge=merge)
+
+    monkeypatch.setattr(doc_ref, "set", flaky_set)
+    manager.set("theme", "dark")
+    manager.set("currency", "USD")
+
+    assert _wait(lambda: fake_db.docs("usr_config")["u1"].get("theme") == "dark")
+    assert len(calls) == 3
+    assert calls[-1] == {"theme": "dark", "currency": "USD"}
+    assert fake_db.docs("usr_config")["u1"]["currency"] == "USD"
+    assert manager._pending == {} and manager._failures == 0
@@ -1,5 +1,19 @@
+from logic.lazy_imports import lazy_attrs
+
 from .login_screen import LoginScreen
-from .dashboard import DashboardWindow
-from .transaction_form import TransactionForm
-from .widgets import TransactionCard, ChartWidget
-from PyQt6.QtWidgets import QWidget, QVBoxLayout
+from .widgets import TransactionCard
+
+# Dashboard, formulário e gráfico carregam matplotlib/Firebase: só no primeiro acesso
+__getattr__ = lazy_attrs(__name__, {
+    "DashboardWindow": ".dashboard",
+    "TransactionForm": ".transaction_form",
+    "ChartWidget": ".widgets.chart_widget",
+})
+
+__all__ = [
+    "LoginScreen",
+    "DashboardWindow",
+    "TransactionForm",
+    "TransactionCard",
+    "ChartWidget",
+]
@@ -4,7 +4,8 @@ from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QSizePolicy
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from logic.ai_assistant import AIAssistant
-from database.data_manager import load_transactions
+from database.data_manager import load_cached_transactions
+from logic.aggregation import summarize
 
 
 class AssistantChart(QWidget):
@@ -37,7 +38,7 @@ class AssistantChart(QWidget):
 
     def update_analysis(self):
         """Atualiza gráfico e pede análise para a IA"""
-        transactions = load_transactions(user_id=self.user_id)
+        transactions = load_cached_transactions(self.user_id)
 
         if not transactions:
             self.analysis_label.setText("⚠️ Nenhuma transação encontrada.")
@@ -47,18 +48,15 @@ class AssistantChart(QWidget):
         self.figure.clear()
         ax = self.figure.add_subplot(111)
 
-        receitas = sum(t["valor"] for t in transactions if t["tipo"] == "receita")
-        despesas = sum(t["valor"] for t in transactions if t["tipo"] == "despesa")
+        summary = summarize(transactions, to_currency="BRL")
+        receitas, despesas = summary["income"], summary["expense"]
 
         ax.bar(["Receitas", "Despesas"], [receitas, despesas], color=["green", "red"])
         ax.set_title("Resumo Financeiro")
         self.canvas.draw()
 
-        # --- Parte 2: análise com IA
-        pergunta = (
-            f"Com base nessas transações: {transactions}, "
-            "faça uma análise breve sobre o equilíbrio financeiro do usuário."
-        )
+        # --- Parte 2: análise com IA (o resumo das transações é anexado por ask)
+        pergunta = "Faça uma análise breve sobre o equilíbrio financeiro do usuário."
 
-        resposta = self.assistant.ask(pergunta, user_id=self.user_id)
+        resposta = self.assistant.ask(pergunta, user_id=self.user_id, transactions=transactions)
         self.analysis_label.setText(f"🤖 {resposta}")
@@ -0,0 +1,68 @@
+# ui/async_worker.py
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    """Sinais emitidos pelo Worker (entregues na thread da interface)."""
+    result = pyqtSignal(object)
+    error = pyqtSignal(object)
+    finished = pyqtSignal()
+    progress = pyqtSignal(object, object)  # (feito, total)
+
+
+class Worker(QRunnable):
+    """Executa fn(*args, **kwargs) no pool de threads compartilhado."""
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(e)
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+# Mantém os sinais vivos até o término (o QRunnable é apagado pelo pool)
+_active_signals = set()
+
+
+def thread_pool() -> QThreadPool:
+    return QThreadPool.globalInstance()
+
+
+def run_async(fn, *args, on_result=None, on_error=None, on_finished=None, on_progress=None, **kwargs) -> Worker:
+    """
+    Agenda fn(*args, **kwargs) fora da thread da interface.
+    Os callbacks on_result(valor), on_error(exceção) e on_finished() rodam na thread da interface.
+    Com on_progress(feito, total), fn recebe progress_callback=... e pode chamá-lo da thread de trabalho.
+    Deve ser chamada a partir da thread da interface.
+    """
+    worker = Worker(fn, *args, **kwargs)
+    signals = worker.signals
+    _active_signals.add(signals)
+
+    if on_progress:
+        signals.progress.connect(on_progress)
+        worker.kwargs["progress_callback"] = signals.progress.emit
+
+    if on_result:
+        signals.result.connect(on_result)
+    if on_error:
+        signals.error.connect(on_error)
+    else:
+        signals.error.connect(lambda e: print(f"[Worker] Erro em {getattr(fn, '__name__', fn)}: {e}"))
+    if on_finished:
+        signals.finished.connect(on_finished)
+    signals.finished.connect(lambda: _active_signals.discard(signals))
+
+    thread_pool().start(worker)
+    return worker
@@ -1,21 +1,27 @@
 # ui/dashboard.py  (PyQt6)
 
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QGroupBox,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QGroupBox,
     QLineEdit, QComboBox, QDateEdit, QDialog, QDialogButtonBox,
     QTextEdit
 )
-from PyQt6.QtCore import Qt, QDate, QTimer
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QTextCursor
 from ui.widgets.chart_widget import ChartWidget
+from ui.widgets.transaction_table_model import TransactionTableModel, create_transaction_view
+from ui.async_worker import run_async
 
 from ui.transaction_form import TransactionForm
 from ui.settings_screen import SettingsScreen
 from ui.transactions_screen import TransactionsScreen
-from database.data_manager import load_transactions, filter_transactions
+from database.data_manager import load_cached_transactions, transaction_index, listen_transactions
+from database.transaction_index import drop_index
 from logic.theme_manager import set_theme, load_theme_qss
-from logic.usr_config import UserConfigManager
+from logic.usr_config import close_session_config, get_session_config
 from logic.finance_logic import FinanceLogic
+from logic.money import convert_cents, from_cents
+from logic.transaction import Transaction, to_cents
+from logic.aggregation import summarize, apply_delta
 
 try:
     from logic.ai_assistant import AIAssistant
@@ -24,15 +30,28 @@ except Exception:
 
 
 class DashboardWindow(QWidget):
+    # Mudanças em tempo real (emitido pela thread do Firestore, entregue na da interface)
+    transactions_changed = pyqtSignal(object)
+    # Config alterada em outro lugar (idem: chega pela thread do Firestore)
+    config_received = pyqtSignal(object)
+
     def __init__(self, username: str):
         super().__init__()
         self.username = username
         self.transactions = []
+        self.summary = summarize([])
         self.user_config = {}
+        self._load_request = 0  # descarta resultados de carregamentos antigos
+        self._filtered = False  # tabela mostrando o resultado de um filtro
+        self._closed = False
+        self.tx_listener = None
 
         self.finance = FinanceLogic()
 
         # ---------------- Configurações ----------------
+        # Uma leitura só (em segundo plano), compartilhada com a tela de configurações
+        self.config_store = None
+        self.config_listener = None
         self.settings_widget = SettingsScreen(self.username)
         self.settings_widget.theme_changed.connect(self.apply_theme)
         self.settings_widget.config_changed.connect(self.on_config_changed)
@@ -48,23 +67,12 @@ class DashboardWindow(QWidget):
             except Exception as e:
                 self.assistant_error = str(e)
 
-        # Carregar configs do usuário
-        try:
-            cfg = UserConfigManager.get_user_config(self.username)
-        except Exception:
-            cfg = {}
-        self.apply_user_config(cfg)
-
-        try:
-            self.config_listener = UserConfigManager.listen_user_config(
-                self.username, self.apply_user_config
-            )
-        except Exception:
-            self.config_listener = None
-
-        # Montar interface
+        # Montar interface (tema, moeda e avatar chegam com a config)
+        self.config_received.connect(self._apply_user_config_ui)
         self.init_ui()
+        self.load_user_config()
         self.update_dashboard()
+        self.start_transactions_listener()
 
     # ---------------- UI ----------------
     def init_ui(self):
@@ -129,13 +137,14 @@ class DashboardWindow(QWidget):
         controls.addWidget(self.refresh_btn)
         right_layout.addLayout(controls)
 
-        # Tabela
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["Data", "Descrição", "Categoria", "Valor", "Tipo"])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.verticalHeader().setVisible(False)
-        self.table.setAlternatingRowColors(True)
+        # Tabela (modelo/visão: células formatadas sob demanda)
+        self.table_model = TransactionTableModel(
+            [("Data", "date"), ("Descrição", "desc"), ("Categoria", "category"), ("Valor", "amount"), ("Tipo", "type")],
+            formatters={"amount": self.format_amount},
+        )
+        self.table, self.table_proxy = create_transaction_view(self.table_model, self)
+        # Mais recentes primeiro; linhas novas entram já na posição certa
+        self.table.sortByColumn(0, Qt.SortOrder.DescendingOrder)
         right_layout.addWidget(self.table)
 
         # Assistente Financeiro
@@ -176,73 +185,106 @@ class DashboardWindow(QWidget):
         self.transactions_btn.clicked.connect(self.show_transactions_content)
         self.add_transaction_btn.clicked.connect(self.open_transaction_form)
         self.filter_btn.clicked.connect(self.open_filter_dialog)
-        self.refresh_btn.clicked.connect(self.update_dashboard)
+        self.refresh_btn.clicked.connect(lambda: self.update_dashboard())
         self.logout_btn.clicked.connect(self.close)
         self.chat_send_btn.clicked.connect(self.on_send_message)
 
     # ---------------- Dashboard Logic ----------------
     def update_dashboard(self, transactions=None):
-        self.transactions = transactions or load_transactions(user_id=self.username) or []
-        if not isinstance(self.transactions, list):
-            self.transactions = []
+        """
+        Atualiza tabela, saldo e gráfico. Sem `transactions`, carrega os dados
+        em segundo plano e mostra um estado de carregamento enquanto isso.
+        """
+        if transactions is not None:
+            self.render_transactions(transactions)
+            return
 
-        self.load_transactions_table(self.transactions)
-        self.update_balance(self.transactions)
-        self.update_chart(self.transactions)
+        self._load_request += 1
+        request_id = self._load_request
+        self.balance_label.setText("Saldo: carregando...")
+        self.refresh_btn.setDisabled(True)
+        run_async(
+            load_cached_transactions, self.username,
+            on_result=lambda txs, rid=request_id: self._on_transactions_loaded(rid, txs),
+            on_error=lambda e, rid=request_id: self._on_transactions_error(rid, e),
+        )
+
+    def _on_transactions_loaded(self, request_id, transactions):
+        if request_id != self._load_request:
+            return
+        self.refresh_btn.setDisabled(False)
+        self._filtered = False
+        self.render_transactions(transactions)
 
-    def load_transactions_table(self, transactions):
-        display_currency = self.user_config.get("currency", "BRL")
-        self.table.setRowCount(len(transactions))
-        for row, tx in enumerate(transactions):
-            date_str = tx.get("date", "")
-            desc = tx.get("desc", "")
-            category = tx.get("category", "")
-            amount = float(tx.get("amount", 0) or 0)
-            tx_currency = tx.get("currency", "BRL")
-            typ = tx.get("type", "")
+    def _on_transactions_error(self, request_id, error):
+        if request_id != self._load_request:
+            return
+        self.refresh_btn.setDisabled(False)
+        print(f"[Dashboard] Falha ao carregar transações: {error}")
+        self.render_transactions(self.transactions)
 
-            try:
-                converted_amount = self.finance.convert_currency(amount, tx_currency, display_currency)
-            except Exception:
-                converted_amount = amount
+    def render_transactions(self, transactions):
+        self.transactions = transactions if isinstance(transactions, list) else []
+        self.summary = summarize(
+            self.transactions, to_currency=self.user_config.get("currency", "BRL"), unknown_as_expense=True
+        )
 
-            display_text = self.finance.format_currency(converted_amount, display_currency)
+        self.load_transactions_table(self.transactions)
+        self.update_balance()
+        self.update_chart()
 
-            self.table.setItem(row, 0, QTableWidgetItem(date_str))
-            self.table.setItem(row, 1, QTableWidgetItem(desc))
-            self.table.setItem(row, 2, QTableWidgetItem(category))
-            self.table.setItem(row, 3, QTableWidgetItem(display_text))
-            self.table.setItem(row, 4, QTableWidgetItem(typ))
+    def load_transactions_table(self, transactions):
+        self.table_model.set_transactions(transactions)
+        self.transactions = self.table_model.transactions  # a mesma lista é atualizada pelas mudanças
+
+    # ---------------- Tempo real ----------------
+    def start_transactions_listener(self):
+        self.transactions_changed.connect(self.apply_transaction_changes)
+        run_async(
+            listen_transactions, self.username, self.transactions_changed.emit,
+            on_result=self._on_listener_started,
+            on_error=lambda e: print(f"[Dashboard] Tempo real indisponível: {e}"),
+        )
+
+    def _on_listener_started(self, watch):
+        if self._closed:
+            watch.unsubscribe()
+            return
+        self.tx_listener = watch
+
+    def apply_transaction_changes(self, changes):
+        """
+        Aplica mudanças [(tipo, transação)] sem recarregar nada: cada uma ajusta
+        só a linha da tabela, o resumo (saldo/gráfico) e o que estiver visível.
+        Com um filtro ativo a tabela fica como está (Atualizar volta à lista completa).
+        """
+        if self._filtered:
+            return
+        currency = self.user_config.get("currency", "BRL")
+        for kind, tx in changes:
+            if kind == "removed":
+                old = self.table_model.remove_transaction(tx["id"])
+                if old is not None:
+                    apply_delta(self.summary, old, None, to_currency=currency, unknown_as_expense=True)
+            else:
+                old = self.table_model.upsert_transaction(tx)
+                apply_delta(self.summary, old, tx, to_currency=currency, unknown_as_expense=True)
+        self.update_balance()
+        self.update_chart()
 
-    def update_balance(self, transactions):
-        saldo = 0.0
+    def format_amount(self, tx) -> str:
+        """Converte e formata o valor de uma linha (chamado pelo modelo só para células visíveis)."""
         display_currency = self.user_config.get("currency", "BRL")
-        for tx in transactions:
-            amt = float(tx.get("amount", 0) or 0)
-            tx_currency = tx.get("currency", "BRL")
-            try:
-                converted = self.finance.convert_currency(amt, tx_currency, display_currency)
-            except Exception:
-                converted = amt
-            if tx.get("type") in ("entrada", "receita"):
-                saldo += converted
-            else:
-                saldo -= converted
-        self.balance_label.setText(f"Saldo: {self.finance.format_currency(saldo, display_currency)}")
+        cents = tx.amount_cents if isinstance(tx, Transaction) else to_cents(tx.get("amount"))
+        converted = convert_cents(cents, tx.get("currency", "BRL"), display_currency)
+        return self.finance.format_currency(from_cents(converted), display_currency)
 
-    def update_chart(self, transactions):
-        normalized = []
-        for tx in transactions:
-            amt = float(tx.get("amount", 0) or 0)
-            tx_currency = tx.get("currency", "BRL")
-            try:
-                converted = self.finance.convert_currency(amt, tx_currency, self.user_config.get("currency", "BRL"))
-            except Exception:
-                converted = amt
-            typ = tx.get("type", "").lower()
-            typ_std = "income" if typ in ("entrada", "receita", "income") else "expense"
-            normalized.append({"value": converted, "type": typ_std, "category": tx.get("category", "Outros")})
+    def update_balance(self):
+        display_currency = self.user_config.get("currency", "BRL")
+        saldo = self.summary["balance"]
+        self.balance_label.setText(f"Saldo: {self.finance.format_currency(saldo, display_currency)}")
 
+    def update_chart(self):
         theme = self.user_config.get("theme", "light")
         if theme == "dark":
             bg_color = "#1E1E1E"
@@ -251,12 +293,14 @@ class DashboardWindow(QWidget):
             bg_color = "#F9FAFB"
             text_color = "#1E1E1E"
 
-        self.chart_canvas.update_chart(normalized, bg_color=bg_color, text_color=text_color)
+        self.chart_canvas.update_totals(
+            self.summary["income"], self.summary["expense"], bg_color=bg_color, text_color=text_color
+        )
 
     # ---------------- Actions ----------------
     def open_transaction_form(self):
         self.transaction_form = TransactionForm(user_id=self.username)
-        self.transaction_form.transaction_added.connect(self.update_dashboard)
+        self.transaction_form.transaction_added.connect(lambda tx: self.apply_transaction_changes([("added", tx)]))
         self.transaction_form.show()
 
     # ---------------- Filter ----------------
@@ -264,39 +308,16 @@ class DashboardWindow(QWidget):
         dlg = FilterDialog(self)
         if dlg.exec() == QDialog.DialogCode.Accepted:
             f = dlg.get_filters()
-            try:
-                filtered = filter_transactions(
-                    user_id=self.username,
-                    tx_type=f["type"],
-                    start_date=f["start_date"],
-                    end_date=f["end_date"],
-                    category=f["category"] or None,
-                    min_amount=f["min_amount"],
-                    max_amount=f["max_amount"],
-                )
-            except Exception:
-                filtered = self._local_filter(self.transactions, f)
+            filtered = transaction_index(self.username).query(
+                start_date=f["start_date"].toPyDate() if f["start_date"] else None,
+                end_date=f["end_date"].toPyDate() if f["end_date"] else None,
+                tx_type=f["type"],
+                category=f["category"] or None,
+                min_amount=f["min_amount"] or None,
+                max_amount=f["max_amount"] or None,
+            )
             self.update_dashboard(filtered)
-
-    def _local_filter(self, transactions, f):
-        filtered = []
-        for tx in transactions:
-            if f["type"] and tx.get("type") != f["type"]:
-                continue
-            if f["category"] and tx.get("category") != f["category"]:
-                continue
-            tx_date = QDate.fromString(tx.get("date", ""), "yyyy-MM-dd")
-            if f["start_date"] and tx_date < f["start_date"]:
-                continue
-            if f["end_date"] and tx_date > f["end_date"]:
-                continue
-            amt = float(tx.get("amount", 0) or 0)
-            if f["min_amount"] and amt < f["min_amount"]:
-                continue
-            if f["max_amount"] and amt > f["max_amount"]:
-                continue
-            filtered.append(tx)
-        return filtered
+            self._filtered = True
 
     # ---------------- Navegação ----------------
     def show_dashboard_content(self):
@@ -325,44 +346,113 @@ class DashboardWindow(QWidget):
             return
         self.chat_history.append(f"👤 Você: {msg}")
         self.chat_input.clear()
-        if self.assistant:
-            response = self.assistant.ask(msg, user_id=self.username)
-            self.chat_history.append(f"🤖 Assistente: {response}")
+        if not self.assistant:
+            return
+
+        # A resposta chega em pedaços (thread de trabalho) e é anexada conforme aparece
+        self.chat_history.append("🤖 Assistente: ")
+        self.chat_send_btn.setDisabled(True)
+        self.chat_input.setDisabled(True)
+        run_async(
+            self._stream_answer, msg,
+            on_progress=lambda delta, _total: self._append_chat_text(delta),
+            on_error=lambda e: self._append_chat_text(f"⚠️ Erro ao acessar a IA: {e}"),
+            on_finished=self._on_answer_finished,
+        )
+
+    def _stream_answer(self, msg, progress_callback=None):
+        for delta in self.assistant.ask_stream(msg, user_id=self.username):
+            progress_callback(delta, None)
+
+    def _append_chat_text(self, text):
+        cursor = self.chat_history.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        self.chat_history.setTextCursor(cursor)
+        self.chat_history.ensureCursorVisible()
+
+    def _on_answer_finished(self):
+        self.chat_send_btn.setDisabled(False)
+        self.chat_input.setDisabled(False)
+        self.chat_input.setFocus()
 
     # ---------------- Theme / Config ----------------
     def apply_theme(self, theme):
         set_theme(theme)
         self.setStyleSheet(load_theme_qss())
-        self.update_chart(self.transactions)
+        self.update_chart()
+
+    def load_user_config(self):
+        run_async(
+            get_session_config, self.username,
+            on_result=self._on_config_loaded,
+            on_error=lambda e: print(f"Erro ao carregar configurações: {e}"),
+        )
+
+    def _on_config_loaded(self, store):
+        if self._closed:
+            close_session_config(self.username)  # janela fechada antes da leitura terminar
+            return
+        self.config_store = store
+        try:
+            self.config_listener = store.subscribe(self.apply_user_config)
+        except Exception as e:
+            print(f"Erro ao escutar configurações: {e}")
+        self._apply_user_config_ui(dict(store.config))
 
     def apply_user_config(self, config: dict):
-        QTimer.singleShot(0, lambda cfg=config: self._apply_user_config_ui(cfg))
+        self.config_received.emit(config)
 
     def _apply_user_config_ui(self, config: dict):
         if not config:
             return
+        old_currency = self.user_config.get("currency", "BRL")
         self.user_config = config
         theme = config.get("theme")
         if theme:
             self.apply_theme(theme)
+        self._apply_avatar_color(config)
+        if config.get("currency", "BRL") != old_currency:
+            self.apply_currency()
+
+    def apply_currency(self):
+        """Refaz o resumo na moeda de exibição e redesenha os valores, sem recarregar as transações."""
+        self.summary = summarize(
+            self.transactions, to_currency=self.user_config.get("currency", "BRL"), unknown_as_expense=True
+        )
+        self.table_model.refresh_formatting()
+        self.update_balance()
+        self.update_chart()
+
+    def _apply_avatar_color(self, config: dict):
         avatar_color = config.get("avatar_color")
         if avatar_color:
             self.user_icon.setStyleSheet(f"border-radius:21px; background-color:{avatar_color};")
-        self.update_dashboard()
 
     def on_config_changed(self, key, value):
+        # A gravação fica com a config da sessão (agrupada e só o campo alterado)
         self.user_config[key] = value
-        UserConfigManager.set_user_config(self.username, self.user_config)  # salva config
         if key == "currency":
-            self.update_dashboard()
+            self.apply_currency()
         elif key == "theme":
             self.apply_theme(value)
 
     def closeEvent(self, event):
+        self._closed = True
+        if self.tx_listener is not None:
+            try:
+                self.tx_listener.unsubscribe()
+            except Exception as e:
+                print(f"Erro ao encerrar o tempo real: {e}")
+            self.tx_listener = None
+        if self.config_listener is not None:
+            self.config_listener()
+            self.config_listener = None
         try:
-            UserConfigManager.set_user_config(self.username, self.user_config)
+            close_session_config(self.username)  # envia o que ainda estiver na janela de agrupamento
         except Exception as e:
             print(f"Erro ao salvar configurações: {e}")
+        drop_index(self.username)  # libera a memória; o próximo login remonta a partir do cache
         super().closeEvent(event)
 
 
@@ -5,6 +5,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import pyqtSignal, Qt
 from logic.auth import validate_login
 from ui.update_pass import UpdatePasswordWindow
+from ui.async_worker import run_async
 
 class LoginScreen(QWidget):
     login_success = pyqtSignal(str)
@@ -82,13 +83,24 @@ class LoginScreen(QWidget):
             QMessageBox.warning(self, "Erro", "Preencha todos os campos.")
             return
 
-        try:
-            if validate_login(user, password):
-                self.login_success.emit(user)
-            else:
-                QMessageBox.warning(self, "Erro", "Usuário ou senha inválidos.")
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Falha ao verificar login:\n{str(e)}")
+        self.login_btn.setDisabled(True)
+        self.login_btn.setText("Entrando...")
+        run_async(
+            validate_login, user, password,
+            on_result=lambda ok: self._on_login_result(user, ok),
+            on_error=lambda e: QMessageBox.critical(self, "Erro", f"Falha ao verificar login:\n{str(e)}"),
+            on_finished=self._reset_login_button,
+        )
+
+    def _on_login_result(self, user, ok):
+        if ok:
+            self.login_success.emit(user)
+        else:
+            QMessageBox.warning(self, "Erro", "Usuário ou senha inválidos.")
+
+    def _reset_login_button(self):
+        self.login_btn.setDisabled(False)
+        self.login_btn.setText("Login")
 
     def open_update_password(self):
         user = self.user_input.text().strip()
@@ -3,6 +3,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import pyqtSignal, Qt
 from logic.auth import validate_registration, register_user
+from ui.async_worker import run_async
 
 class RegisterWindow(QWidget):
     user_registered = pyqtSignal(str)  # Sinal que emite o username registrado
@@ -68,15 +69,29 @@ class RegisterWindow(QWidget):
         password = self.pass_input.text().strip()
         confirm = self.confirm_pass_input.text().strip()
 
+        self.register_btn.setDisabled(True)
+        run_async(
+            self._register, username, email, password, confirm,
+            on_result=lambda res: self._on_register_result(username, res),
+            on_error=lambda e: QMessageBox.critical(self, "Erro", f"Falha ao registrar usuário: {str(e)}"),
+            on_finished=lambda: self.register_btn.setDisabled(False),
+        )
+
+    @staticmethod
+    def _register(username, email, password, confirm):
+        """Roda fora da thread da interface (validação e registro acessam o Firebase)."""
         valid, msg = validate_registration(username, password, confirm, email)
         if not valid:
+            return False, msg
+        if not register_user(username, password, email):
+            return False, "Falha ao registrar usuário."
+        return True, ""
+
+    def _on_register_result(self, username, result):
+        ok, msg = result
+        if not ok:
             QMessageBox.warning(self, "Erro", msg)
             return
-
-        try:
-            register_user(username, password, email)
-            QMessageBox.information(self, "Sucesso", "Usuário registrado com sucesso!")
-            self.user_registered.emit(username)  # emite o sinal
-            self.close()
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Falha ao registrar usuário: {str(e)}")
+        QMessageBox.information(self, "Sucesso", "Usuário registrado com sucesso!")
+        self.user_registered.emit(username)  # emite o sinal
+        self.close()
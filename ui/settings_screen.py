@@ -5,10 +5,11 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal, QPropertyAnimation, QEasingCurve
 from PyQt6.QtGui import QFont
 
-from logic.usr_config import UserConfigManager
+from logic.usr_config import get_session_config
 from logic.finance_logic import FinanceLogic
 from logic.theme_manager import set_theme, get_theme
 from logic.customize import Customize
+from ui.async_worker import run_async
 
 
 class SettingsScreen(QWidget):
@@ -20,11 +21,22 @@ class SettingsScreen(QWidget):
         super().__init__()
         self.user_id = user_id
         self.finance = FinanceLogic()
-        self.user_config = UserConfigManager(self.user_id)
+        self.user_config = None  # config da sessão, lida em segundo plano
+        self._loading = False
 
         self.setFont(Customize.app_font(10))
         self.init_ui()
-        self.load_from_config(self.user_config.config)
+        self.setDisabled(True)
+        run_async(
+            get_session_config, self.user_id,
+            on_result=self._on_config_loaded,
+            on_error=lambda e: print(f"Erro ao carregar configurações: {e}"),
+        )
+
+    def _on_config_loaded(self, store):
+        self.user_config = store
+        self.load_from_config(store.config)
+        self.setDisabled(False)
 
     # ======================
     # UI
@@ -149,38 +161,54 @@ class SettingsScreen(QWidget):
 
     def load_from_config(self, cfg: dict):
         theme = cfg.get("theme", get_theme())
-        currency = self.user_config.get("currency", "BRL")
+        currency = cfg.get("currency", "BRL")
         tz = cfg.get("timezone", "UTC-3")
         show_email = bool(cfg.get("show_email", True))
         show_birth = bool(cfg.get("show_birthdate", False))
 
-        idx = self.currency_cb.findText(currency)
-        if idx >= 0:
-            self.currency_cb.setCurrentIndex(idx)
-        idx = self.tz_cb.findText(tz)
-        if idx >= 0:
-            self.tz_cb.setCurrentIndex(idx)
-        self.show_email_chk.setChecked(show_email)
-        self.show_birth_chk.setChecked(show_birth)
+        # Preencher os campos não é uma alteração do usuário: nada é gravado nem emitido
+        self._loading = True
+        try:
+            idx = self.currency_cb.findText(currency)
+            if idx >= 0:
+                self.currency_cb.setCurrentIndex(idx)
+            idx = self.tz_cb.findText(tz)
+            if idx >= 0:
+                self.tz_cb.setCurrentIndex(idx)
+            self.show_email_chk.setChecked(show_email)
+            self.show_birth_chk.setChecked(show_birth)
+        finally:
+            self._loading = False
 
         set_theme(theme)
 
+    def _can_save(self) -> bool:
+        return self.user_config is not None and not self._loading
+
     # === Ações ===
     def on_theme_change(self, theme_name: str):
+        if not self._can_save():
+            return
         self.user_config.set("theme", theme_name)
         Customize.apply_theme(theme_name)
         self.theme_changed.emit(theme_name)
         self.config_changed.emit("theme", theme_name)
 
     def on_currency_change(self, new_currency: str):
+        if not self._can_save():
+            return
         self.user_config.set("currency", new_currency)
         self.config_changed.emit("currency", new_currency)
 
     def on_timezone_change(self, new_tz: str):
+        if not self._can_save():
+            return
         self.user_config.set("timezone", new_tz)
         self.config_changed.emit("timezone", new_tz)
 
     def on_flag_change(self, key: str, value):
+        if not self._can_save():
+            return
         self.user_config.set(key, value)
         self.config_changed.emit(key, value)
 
@@ -5,10 +5,10 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import pyqtSignal, QDate, Qt
 from datetime import datetime
-import uuid
 
-from database.data_manager import add_transaction  # Apenas Firebase agora
+from database.data_manager import add_transaction  # Cache local + fila de envio ao Firebase
 from logic.finance_logic import FinanceLogic
+from ui.async_worker import run_async
 
 
 class TransactionForm(QWidget):
@@ -146,15 +146,23 @@ class TransactionForm(QWidget):
             "date": data.strftime("%d/%m/%Y"),
             "recurrence": recurrence,
             "currency": self.user_currency,
-            "id": str(uuid.uuid4())  # ID temporário
         }
 
-        # 🔹 Salva no Firebase
-        firebase_id = add_transaction(transaction)
-        transaction["id"] = firebase_id
+        # 🔹 Salva localmente (fora da thread da interface); o envio ao Firebase acontece em segundo plano
+        self.add_btn.setDisabled(True)
+        run_async(
+            add_transaction, transaction,
+            on_result=lambda _id: self._on_saved(transaction),
+            on_error=self._on_save_error,
+        )
 
+    def _on_saved(self, transaction: dict):
         # 🔹 Emite evento para atualizar Dashboard
         self.transaction_added.emit(transaction)
 
         # 🔹 Fecha o formulário
         self.close()
+
+    def _on_save_error(self, error):
+        self.add_btn.setDisabled(False)
+        QMessageBox.critical(self, "Erro", f"Falha ao salvar transação: {error}")
@@ -2,13 +2,16 @@
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QGroupBox, QComboBox,
-    QLineEdit, QMessageBox, QFileDialog
+    QGroupBox, QComboBox, QLineEdit, QMessageBox, QFileDialog
 )
 from PyQt6.QtCore import Qt
 from logic.transactions_manager import (
-    get_all_transactions, remove_transaction, restore_deleted_transaction, export_transactions_csv
+    iter_transactions, get_transactions_page, remove_transaction,
+    restore_deleted_transaction, export_transactions_csv
 )
+from logic.statement_import import import_statement
+from ui.async_worker import run_async
+from ui.widgets.transaction_table_model import TransactionTableModel, create_transaction_view
 from datetime import datetime
 
 # ------------------ FilterDialog ------------------
@@ -82,9 +85,11 @@ class TransactionsScreen(QWidget):
             self.parent_layout.addWidget(self)
 
         self.deleted_transactions = []
-        self.all_transactions = []
-        self.displayed_transactions = []
-        self.next_load_index = 0
+        self.filters = {}
+        self.cursor = None
+        self.has_more = True
+        self.loading = False
+        self.generation = 0  # incrementado a cada recarga; páginas antigas são ignoradas
         self.filter_dialog = None
 
         self.init_ui()
@@ -100,19 +105,20 @@ class TransactionsScreen(QWidget):
         self.delete_btn = QPushButton("Deletar Selecionado")
         self.restore_btn = QPushButton("Restaurar Última Deleção")
         self.export_btn = QPushButton("Exportar CSV")
+        self.import_btn = QPushButton("Importar Extrato")
         btn_layout.addWidget(self.filter_btn)
         btn_layout.addWidget(self.delete_btn)
         btn_layout.addWidget(self.restore_btn)
         btn_layout.addWidget(self.export_btn)
+        btn_layout.addWidget(self.import_btn)
         self.main_layout.addLayout(btn_layout)
 
         # ------------------ Tabela ------------------
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["Data", "Categoria", "Valor", "Tipo", "Descrição"])
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.verticalHeader().setVisible(False)
-        self.table.setAlternatingRowColors(True)
+        self.table_model = TransactionTableModel(
+            [("Data", "date"), ("Categoria", "category"), ("Valor", "amount"), ("Tipo", "type"), ("Descrição", "desc")],
+            formatters={"amount": lambda t: f"R$ {float(t.get('amount') or 0):.2f}"},
+        )
+        self.table, self.table_proxy = create_transaction_view(self.table_model, self)
         self.table.verticalScrollBar().valueChanged.connect(self.check_scroll_end)
         self.main_layout.addWidget(self.table)
 
@@ -121,6 +127,7 @@ class TransactionsScreen(QWidget):
         self.delete_btn.clicked.connect(self.delete_selected)
         self.restore_btn.clicked.connect(self.restore_last)
         self.export_btn.clicked.connect(self.export_csv)
+        self.import_btn.clicked.connect(self.import_statement)
 
     # ------------------ Scroll infinito ------------------
     def check_scroll_end(self, value):
@@ -128,35 +135,39 @@ class TransactionsScreen(QWidget):
             self.load_next_batch()
 
     def load_next_batch(self):
-        if self.next_load_index >= len(self.all_transactions):
+        if not self.has_more or self.loading:
             return
 
-        batch = self.all_transactions[self.next_load_index:self.next_load_index + self.LOAD_BATCH]
-        start_row = self.table.rowCount()
-        self.table.setRowCount(start_row + len(batch))
-
-        for i, t in enumerate(batch):
-            date = t.get("date") or ""
-            category = t.get("category") or ""
-            amount = t.get("amount", 0.0)
-            ttype = t.get("type") or ""
-            desc = t.get("desc") or ""
-
-            self.table.setItem(start_row + i, 0, QTableWidgetItem(date))
-            self.table.setItem(start_row + i, 1, QTableWidgetItem(category))
-            self.table.setItem(start_row + i, 2, QTableWidgetItem(f"R$ {amount:.2f}"))
-            self.table.setItem(start_row + i, 3, QTableWidgetItem(ttype))
-            self.table.setItem(start_row + i, 4, QTableWidgetItem(desc))
+        # Páginas por cursor (cache local ou, no primeiro acesso, Firestore); ver get_transactions_page
+        self.loading = True
+        generation = self.generation
+        run_async(
+            get_transactions_page, self.user_id,
+            page_size=self.LOAD_BATCH, cursor=self.cursor, **self.filters,
+            on_result=lambda page, gen=generation: self._append_page(gen, page),
+            on_error=lambda e, gen=generation: self._on_page_error(gen, e),
+        )
 
-            self.displayed_transactions.append(t)
+    def _on_page_error(self, generation, error):
+        if generation != self.generation:
+            return
+        self.loading = False
+        print(f"[Transações] Falha ao carregar página: {error}")
 
-        self.next_load_index += len(batch)
+    def _append_page(self, generation, page):
+        if generation != self.generation:
+            return
+        self.loading = False
+        batch, self.cursor = page
+        self.has_more = self.cursor is not None
+        self.table_model.append_transactions(batch)
 
     def reload_transactions(self):
-        self.all_transactions = get_all_transactions(user_id=self.user_id)
-        self.table.setRowCount(0)
-        self.displayed_transactions = []
-        self.next_load_index = 0
+        self.generation += 1
+        self.cursor = None
+        self.loading = False
+        self.has_more = True
+        self.table_model.set_transactions([])
         self.load_next_batch()
 
     # ------------------ Filtros ------------------
@@ -169,43 +180,107 @@ class TransactionsScreen(QWidget):
         start_date = datetime.strptime(filtros["data_inicio"], "%d/%m/%Y") if filtros["data_inicio"] else None
         end_date = datetime.strptime(filtros["data_fim"], "%d/%m/%Y") if filtros["data_fim"] else None
 
-        self.all_transactions = get_all_transactions(user_id=self.user_id, start_date=start_date, end_date=end_date)
-        if filtros["tipo"]:
-            self.all_transactions = [t for t in self.all_transactions if t.get("type") == filtros["tipo"]]
+        self.filters = {
+            "start_date": start_date.date() if start_date else None,
+            "end_date": end_date.date() if end_date else None,
+            "tx_type": filtros["tipo"],
+        }
         self.reload_transactions()
 
     # ------------------ Deletar / Restaurar ------------------
     def delete_selected(self):
-        row = self.table.currentRow()
-        if row < 0:
+        index = self.table.currentIndex()
+        if not index.isValid():
             QMessageBox.warning(self, "Atenção", "Selecione uma transação para deletar.")
             return
 
-        transaction = self.displayed_transactions[row]
-        if remove_transaction(transaction['id']):
-            self.deleted_transactions.append(transaction)
-            self.all_transactions.remove(transaction)
-            self.reload_transactions()
+        row = self.table_proxy.mapToSource(index).row()
+        transaction = self.table_model.transaction_at(row)
+        run_async(
+            remove_transaction, transaction['id'],
+            on_result=lambda ok, tx=transaction: self._on_deleted(tx, ok),
+        )
+
+    def _on_deleted(self, transaction, ok):
+        if not ok:
+            return
+        self.deleted_transactions.append(transaction)
+        for row, tx in enumerate(self.table_model.transactions):
+            if tx is transaction:
+                self.table_model.remove_row(row)
+                break
 
     def restore_last(self):
         if not self.deleted_transactions:
             QMessageBox.information(self, "Info", "Não há transações para restaurar.")
             return
         transaction = self.deleted_transactions.pop()
-        if restore_deleted_transaction(transaction):
-            self.all_transactions.append(transaction)
-            self.reload_transactions()
+        run_async(
+            restore_deleted_transaction, transaction,
+            on_result=lambda ok: ok and self.reload_transactions(),
+        )
 
     # ------------------ Exportar CSV ------------------
     def export_csv(self):
         file_path, _ = QFileDialog.getSaveFileName(
             self, "Salvar CSV", f"transactions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            "CSV Files (*.csv)"
+            "CSV Files (*.csv);;CSV compactado (*.csv.gz)"
         )
         if not file_path:
             return
 
-        if export_transactions_csv(self.all_transactions, file_path):
+        self.export_btn.setDisabled(True)
+        run_async(
+            self._export_filtered, file_path, dict(self.filters),
+            on_result=lambda ok: self._on_exported(ok, file_path),
+            on_progress=self._on_export_progress,
+            on_finished=self._on_export_finished,
+        )
+
+    def _export_filtered(self, file_path, filters, progress_callback=None):
+        # Gerador paginado (mesma origem da tela): as transações nunca ficam todas em memória
+        transactions = iter_transactions(self.user_id, **filters)
+        return export_transactions_csv(transactions, file_path, progress_callback=progress_callback)
+
+    def _on_export_progress(self, done, total):
+        suffix = f"/{total}" if total else ""
+        self.export_btn.setText(f"Exportando... {done}{suffix}")
+
+    def _on_export_finished(self):
+        self.export_btn.setText("Exportar CSV")
+        self.export_btn.setDisabled(False)
+
+    def _on_exported(self, ok, file_path):
+        if ok:
             QMessageBox.information(self, "Sucesso", f"Transações exportadas para {file_path}")
         else:
             QMessageBox.warning(self, "Erro", "Falha ao exportar CSV.")
+
+    # ------------------ Importar extrato ------------------
+    def import_statement(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Importar Extrato", "", "Extratos (*.csv *.ofx *.qfx);;CSV (*.csv);;OFX (*.ofx *.qfx)"
+        )
+        if not file_path:
+            return
+
+        self.import_btn.setDisabled(True)
+        run_async(
+            import_statement, file_path, self.user_id,
+            on_result=self._on_imported,
+            on_error=lambda e: QMessageBox.warning(self, "Erro", f"Falha ao importar extrato: {e}"),
+            on_progress=lambda done, _total: self.import_btn.setText(f"Importando... {done}"),
+            on_finished=self._on_import_finished,
+        )
+
+    def _on_imported(self, summary):
+        message = (f"{summary['imported']} transações importadas.\n"
+                   f"{summary['duplicates']} já existiam e {summary['skipped']} linhas foram ignoradas.")
+        if summary["errors"]:
+            message += "\n\n" + "\n".join(summary["errors"][:5])
+        QMessageBox.information(self, "Importação concluída", message)
+        self.reload_transactions()
+
+    def _on_import_finished(self):
+        self.import_btn.setText("Importar Extrato")
+        self.import_btn.setDisabled(False)
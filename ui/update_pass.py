@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from logic.auth import change_password, MIN_PASSWORD_LENGTH
+from ui.async_worker import run_async
 
 class UpdatePasswordWindow(QWidget):
     def __init__(self, parent=None):
@@ -118,7 +119,9 @@ class UpdatePasswordWindow(QWidget):
             QMessageBox.warning(self, "Erro", f"A senha deve ter pelo menos {MIN_PASSWORD_LENGTH} caracteres.")
             return
 
-        success = change_password(username, email, new_pass)
+        run_async(change_password, username, email, new_pass, on_result=self._on_password_changed)
+
+    def _on_password_changed(self, success):
         if success:
             QMessageBox.information(self, "Sucesso", "Senha atualizada com sucesso.")
             self.close()
@@ -1,20 +1,16 @@
 # Arquivo __init__.py para o pacote widgets
-# Pode ficar vazio, ou importar os widgets principais para facilitar importação externa
+# O ChartWidget (que carrega o matplotlib) é importado sob demanda
 
-from .transaction_card import TransactionCard
-from .chart_widget import ChartWidget
-
-__all__ = [
-    "TransactionCard",
-    "ChartWidget",
-]
-# Arquivo __init__.py para o pacote widgets
-# Pode ficar vazio, ou importar os widgets principais para facilitar importação externa
+from logic.lazy_imports import lazy_attrs
 
 from .transaction_card import TransactionCard
-from .chart_widget import ChartWidget
+from .transaction_table_model import TransactionTableModel, create_transaction_view
+
+__getattr__ = lazy_attrs(__name__, {"ChartWidget": ".chart_widget"})
 
 __all__ = [
     "TransactionCard",
     "ChartWidget",
+    "TransactionTableModel",
+    "create_transaction_view",
 ]
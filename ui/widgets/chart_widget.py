@@ -1,8 +1,25 @@
 # ui/widgets/chart_widget.py
+import math
+
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 
+LABELS = ["Receita", "Despesa"]
+COLORS = ["#4CAF50", "#F44336"]  # verde e vermelho, bom contraste
+START_ANGLE = 90
+LABEL_DISTANCE = 1.1
+PCT_DISTANCE = 0.6
+
+
 class ChartWidget(FigureCanvasQTAgg):
+    """
+    Pizza de receitas x despesas.
+    A figura é montada uma vez; depois só a geometria e os textos das fatias
+    mudam. Gráfico idêntico (mesmos totais e cores) não é redesenhado, troca
+    só de valores usa blitting sobre o fundo em cache e troca de tema pede um
+    redesenho completo via draw_idle.
+    """
+
     def __init__(self, transactions, bg_color="#F9FAFB", text_color="#1E1E1E"):
         self.transactions = transactions
         self.bg_color = bg_color
@@ -11,8 +28,31 @@ class ChartWidget(FigureCanvasQTAgg):
         self.fig = Figure(facecolor=self.bg_color)
         self.ax = self.fig.add_subplot(111)
         super().__init__(self.fig)
+
+        self._rendered_key = None
+        self._background = None
+        self._build()
+        self.mpl_connect("draw_event", self._on_draw)
         self.plot(transactions)
 
+    def _build(self):
+        """Cria fatias e textos uma única vez (marcados como animados para o blitting)."""
+        self.wedges, self.texts, self.autotexts = self.ax.pie(
+            [1, 1],
+            labels=LABELS,
+            autopct="%1.1f%%",
+            colors=COLORS,
+            startangle=START_ANGLE,
+            labeldistance=LABEL_DISTANCE,
+            pctdistance=PCT_DISTANCE,
+        )
+        self.title = self.ax.set_title("Resumo Financeiro")
+        for artist in self._animated_artists():
+            artist.set_animated(True)
+
+    def _animated_artists(self):
+        return [*self.wedges, *self.texts, *self.autotexts]
+
     def update_chart(self, transactions, bg_color=None, text_color=None):
         if bg_color:
             self.bg_color = bg_color
@@ -21,31 +61,83 @@ class ChartWidget(FigureCanvasQTAgg):
         self.transactions = transactions
         self.plot(transactions)
 
-    def plot(self, transactions):
-        self.ax.clear()
-        self.fig.set_facecolor(self.bg_color)
+    def update_totals(self, income, expense, bg_color=None, text_color=None):
+        """Atualiza direto com os totais já calculados (ex.: summarize), sem montar lista."""
+        if bg_color:
+            self.bg_color = bg_color
+        if text_color:
+            self.text_color = text_color
+        self._plot_totals(income, expense)
 
+    def plot(self, transactions):
         # calcular totais
         income = sum(tx["value"] for tx in transactions if tx["type"] == "income")
         expense = sum(tx["value"] for tx in transactions if tx["type"] == "expense")
+        self._plot_totals(income, expense)
+
+    def _plot_totals(self, income, expense):
+        key = (round(income, 2), round(expense, 2), self.bg_color, self.text_color)
+        if key == self._rendered_key:
+            return  # nada mudou: não redesenha
+        theme_changed = self._rendered_key is None or self._rendered_key[2:] != key[2:]
+        self._rendered_key = key
 
+        self._update_values(income, expense)
+        if theme_changed:
+            self._apply_colors()
+            self._background = None
+            self.draw_idle()  # redesenho completo; o draw_event recaptura o fundo
+        else:
+            self._blit()
+
+    def _update_values(self, income, expense):
+        """Atualiza ângulos das fatias e posição/texto dos rótulos, como ax.pie faria."""
         values = [income, expense]
-        labels = ["Receita", "Despesa"]
-        colors = ["#4CAF50", "#F44336"]  # verde e vermelho, bom contraste
-        if sum(values) == 0:
-            values = [1, 1]  # evita erro matplotlib com zero total
-            labels = ["Sem dados", ""]
-
-        wedges, texts, autotexts = self.ax.pie(
-            values,
-            labels=labels,
-            autopct=lambda p: f"{p:.1f}%" if sum(values) > 0 else "",
-            colors=colors,
-            textprops={"color": self.text_color},
-            startangle=90,
-            wedgeprops={"edgecolor": self.bg_color}
-        )
+        has_data = sum(values) > 0
+        if not has_data:
+            values = [1, 1]  # evita pizza vazia
+        total = float(sum(values))
+
+        theta1 = START_ANGLE
+        for i, value in enumerate(values):
+            theta2 = theta1 + 360.0 * value / total
+            self.wedges[i].set_theta1(theta1)
+            self.wedges[i].set_theta2(theta2)
 
+            mid = math.radians((theta1 + theta2) / 2)
+            x, y = math.cos(mid), math.sin(mid)
+            label = self.texts[i]
+            label.set_position((LABEL_DISTANCE * x, LABEL_DISTANCE * y))
+            label.set_horizontalalignment("left" if x > 0 else "right")
+            label.set_text(LABELS[i] if has_data else ("Sem dados" if i == 0 else ""))
+
+            pct = self.autotexts[i]
+            pct.set_position((PCT_DISTANCE * x, PCT_DISTANCE * y))
+            pct.set_text(f"{100.0 * value / total:.1f}%" if has_data else "")
+            theta1 = theta2
+
+    def _apply_colors(self):
+        self.fig.set_facecolor(self.bg_color)
         self.ax.set_facecolor(self.bg_color)
-        self.ax.set_title("Resumo Financeiro", color=self.text_color)
-        self.draw()
+        self.title.set_color(self.text_color)
+        for wedge in self.wedges:
+            wedge.set_edgecolor(self.bg_color)
+        for text in (*self.texts, *self.autotexts):
+            text.set_color(self.text_color)
+
+    # ---------- Blitting ----------
+    def _on_draw(self, _event):
+        self._background = self.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self._animated_artists():
+            self.fig.draw_artist(artist)
+
+    def _blit(self):
+        if self._background is None:
+            self.draw_idle()
+            return
+        self.restore_region(self._background)
+        self._draw_animated()
+        self.blit(self.fig.bbox)
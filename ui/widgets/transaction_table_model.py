@@ -0,0 +1,155 @@
+# ui/widgets/transaction_table_model.py
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PyQt6.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+
+from logic.dates import transaction_day
+
+# Papel usado pelo proxy para ordenar pelo valor bruto (e não pelo texto formatado)
+SORT_ROLE = Qt.ItemDataRole.UserRole
+
+
+class TransactionTableModel(QAbstractTableModel):
+    """
+    Modelo de tabela sobre uma lista de transações (dicts).
+    Nenhum item é criado por linha: o texto de cada célula é gerado sob demanda
+    em data(), só para as células visíveis.
+
+    columns: lista de (título, chave do dict)
+    formatters: {chave: função(tx) -> str} para colunas com formatação própria
+    """
+
+    def __init__(self, columns, formatters=None, parent=None):
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.formatters = formatters or {}
+        self.transactions = []
+        self._row_of = None  # id -> linha; montado sob demanda e mantido a cada alteração
+
+    # ---------- Dados ----------
+    def set_transactions(self, transactions):
+        self.beginResetModel()
+        self.transactions = list(transactions)
+        self._row_of = None
+        self.endResetModel()
+
+    def append_transactions(self, transactions):
+        if not transactions:
+            return
+        first = len(self.transactions)
+        self.beginInsertRows(QModelIndex(), first, first + len(transactions) - 1)
+        self.transactions.extend(transactions)
+        if self._row_of is not None:
+            for row, tx in enumerate(transactions, start=first):
+                self._row_of[tx.get("id")] = row
+        self.endInsertRows()
+
+    def remove_row(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        removed = self.transactions.pop(row)
+        if self._row_of is not None:
+            # Só as linhas abaixo da removida sobem uma posição; a ordem de exibição é mantida
+            self._row_of.pop(removed.get("id"), None)
+            for i in range(row, len(self.transactions)):
+                self._row_of[self.transactions[i].get("id")] = i
+        self.endRemoveRows()
+
+    # ---------- Atualizações incrementais (por id) ----------
+    def row_of(self, doc_id):
+        if self._row_of is None:
+            self._row_of = {tx.get("id"): row for row, tx in enumerate(self.transactions)}
+        return self._row_of.get(doc_id)
+
+    def upsert_transaction(self, tx):
+        """Substitui a linha com o mesmo id (só ela é redesenhada) ou acrescenta uma nova.
+        Retorna a versão anterior (ou None)."""
+        row = self.row_of(tx.get("id"))
+        if row is None:
+            self.append_transactions([tx])
+            return None
+        old = self.transactions[row]
+        self.transactions[row] = tx
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+        return old
+
+    def remove_transaction(self, doc_id):
+        """Remove a linha com esse id. Retorna a transação removida (ou None)."""
+        row = self.row_of(doc_id)
+        if row is None:
+            return None
+        old = self.transactions[row]
+        self.remove_row(row)
+        return old
+
+    def transaction_at(self, row: int):
+        return self.transactions[row]
+
+    def refresh_formatting(self):
+        """Redesenha as células (ex.: após trocar a moeda de exibição)."""
+        if self.transactions:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(len(self.transactions) - 1, len(self.columns) - 1),
+            )
+
+    # ---------- Interface do QAbstractTableModel ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.transactions)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.columns[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        tx = self.transactions[index.row()]
+        key = self.columns[index.column()][1]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            formatter = self.formatters.get(key)
+            if formatter:
+                return formatter(tx)
+            value = tx.get(key)
+            return "" if value is None else str(value)
+
+        if role == SORT_ROLE:
+            value = tx.get(key)
+            if key == "amount":
+                try:
+                    return float(value or 0)
+                except (ValueError, TypeError):
+                    return 0.0
+            if key == "date":
+                # Ordena pelo epoch-day (int), não pelo texto da data
+                day = transaction_day(tx)
+                return -1 if day is None else day
+            return "" if value is None else str(value)
+
+        return None
+
+
+def create_transaction_view(model: TransactionTableModel, parent=None):
+    """
+    Cria um QTableView ordenável (via QSortFilterProxyModel) para o modelo.
+    Retorna (view, proxy).
+    """
+    proxy = QSortFilterProxyModel(parent)
+    proxy.setSourceModel(model)
+    proxy.setSortRole(SORT_ROLE)
+
+    view = QTableView(parent)
+    view.setModel(proxy)
+    # Sem coluna de ordenação inicial: mantém a ordem em que os dados chegam
+    view.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+    view.setSortingEnabled(True)
+    view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+    view.setAlternatingRowColors(True)
+    view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+    view.verticalHeader().setVisible(False)
+    # Altura fixa: o Qt não precisa medir cada linha
+    view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+    return view, proxy